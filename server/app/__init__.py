@@ -1,4 +1,6 @@
+import logging
 import os
+from contextlib import asynccontextmanager
 
 from celery import Celery
 from fastapi import FastAPI
@@ -7,6 +9,9 @@ from fastapi.staticfiles import StaticFiles
 
 from .config import config
 from .routes import api_router
+from .api_dependencies import close_motor_client, create_auth_client, create_http_client_pool, create_job_cache, create_tes_client_pool, ensure_async_database_indexes
+
+logger = logging.getLogger(__name__)
 
 
 def create_app():
@@ -34,8 +39,31 @@ def init_celery_app() -> Celery:
     return celery_app
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await ensure_async_database_indexes()
+    except Exception:
+        logger.exception("Failed to create database indexes")
+
+    app.state.http_clients = create_http_client_pool()
+    app.state.tes_clients = create_tes_client_pool()
+    app.state.job_cache = create_job_cache()
+    app.state.auth_client = create_auth_client(app.state.http_clients)
+    await app.state.auth_client.start()
+
+    yield
+
+    await app.state.auth_client.stop()
+    await app.state.http_clients.aclose()
+    await app.state.tes_clients.aclose()
+    if app.state.job_cache is not None:
+        await app.state.job_cache.close()
+    close_motor_client()
+
+
 def entrypoint(mode="app"):
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     register_routes(app)
 
@@ -1,10 +1,19 @@
-from fastapi import HTTPException, Request
+import random
+import threading
+from uuid import UUID
+
+import jwt
+from fastapi import Depends, HTTPException, Request
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 
 from .auth import AccessToken, AuthClient
 from .config import config
-from .repository import WorkflowRepository, JobRepository
-from .db import MongoDatabase
+from .http_client import HttpClientPool
+from .job_cache import JobCache, MemoryJobCache, RedisJobCache
+from .repository import AsyncWorkflowRepository, WorkflowRepository, JobRepository
+from .db import AsyncBaseDatabase, AsyncMemoryDatabase, BaseDatabase, MemoryDatabase, MemoryStore, MongoDatabase, MotorDatabase
+from .db.models import all_models
 
 async def get_authenticated_user(request: Request) -> str:
     username = request.headers.get("X-Forwarded-Preferred-Username")
@@ -12,7 +21,73 @@ async def get_authenticated_user(request: Request) -> str:
         raise HTTPException(status_code=401, detail="User not authenticated")
     return username
 
-async def get_valid_access_token(request: Request) -> AccessToken:
+def create_http_client_pool() -> HttpClientPool:
+    return HttpClientPool(
+        max_connections_per_host=config.http.max_connections_per_host,
+        max_keepalive_connections=config.http.max_keepalive_connections,
+        keepalive_expiry=config.http.keepalive_expiry,
+        timeout=config.http.timeout,
+        connect_timeout=config.http.connect_timeout,
+    )
+
+def create_tes_client_pool() -> HttpClientPool:
+    return HttpClientPool(
+        max_connections_per_host=config.tes.max_connections_per_host,
+        max_keepalive_connections=config.tes.max_keepalive_connections,
+        keepalive_expiry=config.tes.keepalive_expiry,
+        timeout=config.tes.timeout,
+        connect_timeout=config.tes.connect_timeout,
+        retries=config.tes.retries,
+        retry_backoff=config.tes.retry_backoff,
+    )
+
+def create_job_cache() -> JobCache | None:
+    if config.tes.cache_backend == "memory":
+        return MemoryJobCache(
+            config.tes.cache_running_ttl,
+            config.tes.cache_max_size,
+            config.tes.cache_max_bytes,
+            terminal_ttl=config.tes.cache_terminal_ttl,
+        )
+    if config.tes.cache_backend == "redis":
+        if not config.tes.cache_redis_url:
+            raise Exception("tes.cache_redis_url must be set to use the redis TES cache")
+        return RedisJobCache(
+            config.tes.cache_running_ttl,
+            config.tes.cache_redis_url,
+            terminal_ttl=config.tes.cache_terminal_ttl,
+        )
+    return None
+
+def create_auth_client(http_clients: HttpClientPool) -> AuthClient:
+    return AuthClient(
+        config.app.oidc_url,
+        config.app.oidc_client_id,
+        config.app.oidc_client_secret,
+        http_clients,
+        audience=config.app.oidc_audience,
+        discovery_ttl=config.auth.oidc_discovery_ttl,
+        jwks_ttl=config.auth.jwks_ttl,
+        introspection_cache_ttl=config.auth.introspection_cache_ttl,
+        introspection_cache_size=config.auth.introspection_cache_size,
+        claims_cache_ttl=config.auth.claims_cache_ttl,
+        claims_cache_size=config.auth.claims_cache_size,
+        cache_stats_interval=config.auth.cache_stats_interval,
+    )
+
+async def get_http_client_pool(request: Request) -> HttpClientPool:
+    return request.app.state.http_clients
+
+async def get_tes_client_pool(request: Request) -> HttpClientPool:
+    return request.app.state.tes_clients
+
+async def get_job_cache(request: Request) -> JobCache | None:
+    return request.app.state.job_cache
+
+async def get_auth_client(request: Request) -> AuthClient:
+    return request.app.state.auth_client
+
+async def get_access_token(request: Request, auth_client: AuthClient = Depends(get_auth_client)) -> AccessToken:
     authorization_header = request.headers.get("Authorization", None)
     forwarded_token_header = request.headers.get("X-Forwarded-Access-Token", None)
 
@@ -24,18 +99,145 @@ async def get_valid_access_token(request: Request) -> AccessToken:
         token_value = forwarded_token_header
     else:
         raise HTTPException(status_code=401, detail="No access token provided")
-    auth_client = AuthClient(
-		config.app.oidc_url,
-        config.app.oidc_client_id,
-        config.app.oidc_client_secret
-    )
-    token = AccessToken(token_value, auth_client)
-    if token.is_expired() or not token.is_valid():
+    await auth_client.ensure_loaded()
+    return AccessToken(token_value, auth_client)
+
+async def is_token_valid(token: AccessToken, strategy: str) -> bool:
+    if strategy == "introspect":
+        try:
+            is_expired = await token.is_expired()
+        except jwt.PyJWTError:
+            return False
+        return not is_expired and await token.is_valid()
+
+    if not await token.is_locally_valid():
+        return False
+
+    if strategy == "local_sampled" and random.random() < config.auth.introspection_sample_rate:
+        return await token.is_valid()
+
+    return True
+
+async def get_valid_access_token(token: AccessToken = Depends(get_access_token)) -> AccessToken:
+    """Validates the token using the configured `auth.validation_strategy`."""
+    if not await is_token_valid(token, config.auth.validation_strategy):
+        raise HTTPException(status_code=401, detail="Invalid access token")
+    await token.load_claims()
+    return token
+
+async def get_authorized_workflow_definition_ids(request: Request, authorized_only: bool = False, auth_client: AuthClient = Depends(get_auth_client)) -> set[UUID] | None:
+    """Resolves the `authorized_only` query parameter to the IDs of the workflow
+    definitions the caller may run, or None when no filtering was requested."""
+    if not authorized_only:
+        return None
+
+    token = await get_valid_access_token(await get_access_token(request, auth_client))
+    return token.get_authorized_workflow_definition_ids()
+
+async def get_introspected_access_token(token: AccessToken = Depends(get_access_token)) -> AccessToken:
+    """Always validates the token against the introspection endpoint."""
+    if not await is_token_valid(token, "introspect"):
         raise HTTPException(status_code=401, detail="Invalid access token")
+    await token.load_claims()
     return token
 
-def get_workflow_repository():
-    mongo_client = MongoClient(config.mongo.mongodb_uri, uuidRepresentation="standard")
-    mongo_db = MongoDatabase(mongo_client[config.mongo.db_name])
-    job_repository = JobRepository(config.snakemake.tes_url)
-    return WorkflowRepository(mongo_db, job_repository)
+_mongo_client: MongoClient | None = None
+_mongo_client_lock = threading.Lock()
+
+_motor_client: AsyncIOMotorClient | None = None
+
+_memory_store = MemoryStore()
+
+def _mongo_client_options() -> dict:
+    return dict(
+        uuidRepresentation="standard",
+        maxPoolSize=config.mongo.max_pool_size,
+        minPoolSize=config.mongo.min_pool_size,
+        maxIdleTimeMS=config.mongo.max_idle_time_ms,
+        connectTimeoutMS=config.mongo.connect_timeout_ms,
+        serverSelectionTimeoutMS=config.mongo.server_selection_timeout_ms,
+        socketTimeoutMS=config.mongo.socket_timeout_ms,
+        waitQueueTimeoutMS=config.mongo.wait_queue_timeout_ms,
+    )
+
+def get_mongo_client() -> MongoClient:
+    """Returns the process-wide MongoClient, creating it on first use.
+
+    The client must be created after the process forked (FastAPI lifespan,
+    Celery `worker_process_init`), since MongoClient is not fork-safe.
+    """
+    global _mongo_client
+
+    with _mongo_client_lock:
+        if _mongo_client is None:
+            _mongo_client = MongoClient(config.mongo.mongodb_uri, **_mongo_client_options())
+
+        return _mongo_client
+
+def close_mongo_client():
+    global _mongo_client
+
+    with _mongo_client_lock:
+        if _mongo_client is not None:
+            _mongo_client.close()
+            _mongo_client = None
+
+def get_motor_client() -> AsyncIOMotorClient:
+    """Returns the process-wide Motor client used by the API.
+
+    Motor binds to the running event loop, so it is created from the FastAPI
+    lifespan rather than at import time.
+    """
+    global _motor_client
+
+    if _motor_client is None:
+        _motor_client = AsyncIOMotorClient(config.mongo.mongodb_uri, **_mongo_client_options())
+
+    return _motor_client
+
+def close_motor_client():
+    global _motor_client
+
+    if _motor_client is not None:
+        _motor_client.close()
+        _motor_client = None
+
+def get_database() -> BaseDatabase:
+    if config.database.backend == "memory":
+        return MemoryDatabase(_memory_store)
+    return MongoDatabase(get_mongo_client()[config.mongo.db_name])
+
+def get_async_database() -> AsyncBaseDatabase:
+    if config.database.backend == "memory":
+        return AsyncMemoryDatabase(_memory_store)
+    return MotorDatabase(get_motor_client()[config.mongo.db_name])
+
+def ensure_database_indexes():
+    db = get_database()
+    for model in all_models:
+        db.ensure_indexes(model)
+
+async def ensure_async_database_indexes():
+    db = get_async_database()
+    for model in all_models:
+        await db.ensure_indexes(model)
+
+def create_job_repository(http_clients: HttpClientPool, cache: JobCache | None = None) -> JobRepository:
+    return JobRepository(
+        config.snakemake.tes_url,
+        http_clients,
+        max_concurrency=config.tes.max_concurrent_requests,
+        deadline=config.tes.request_deadline,
+        cache=cache,
+    )
+
+def create_workflow_repository() -> WorkflowRepository:
+    return WorkflowRepository(get_database())
+
+def get_workflow_repository(
+    tes_clients: HttpClientPool = Depends(get_tes_client_pool),
+    job_cache: JobCache | None = Depends(get_job_cache),
+) -> AsyncWorkflowRepository:
+    job_repository = create_job_repository(tes_clients, job_cache)
+    return AsyncWorkflowRepository(get_async_database(), job_repository)
+
@@ -1,9 +1,21 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+from functools import cached_property
 from typing import override
+from uuid import UUID
+import httpx
 import jwt
-import requests
 
+from app.cache import TTLCache
 from app.common.models import VisaJWTPayload, OIDCConfig, UserInfo, TokenInfo, TokenJWTPayload
+from app.http_client import HttpClientPool
 from app.workflow_definition import WorkflowDefinitionMetadata
+from app.workflow_definition.manager import get_workflow_definition_catalog
+
+logger = logging.getLogger(__name__)
 
 
 class Visa:
@@ -35,27 +47,221 @@ class Visa:
         return f"Visa(type={self.type}, value={self.value}, expires={self.expires}, asserted={self.asserted}, source={self.source}, issued_by={self.issued_by})"
 
 
+class TokenClaims:
+    """Userinfo of an access token together with its parsed passport visas.
+
+    Visas are decoded once and indexed by (type, value), so the claims can be
+    shared by every authorization check made for the same token.
+    """
+
+    def __init__(self, userinfo: UserInfo):
+        self.userinfo = userinfo
+        self.visas = [Visa(token=visa) for visa in userinfo.ga4gh_passport_v1]
+        self.entitlements = userinfo.eduperson_entitlement
+
+        self._visa_index = {(visa.type, visa.value) for visa in self.visas}
+        self._entitlement_index = set(self.entitlements)
+
+    def has_visa(self, type: str, value: str) -> bool:
+        return (type, value) in self._visa_index
+
+    def has_entitlement(self, entitlement: str) -> bool:
+        return entitlement in self._entitlement_index
+
+
+class SigningKeyCache:
+    """Signing keys from the provider's JWKS, indexed by `kid`.
+
+    The JWKS is downloaded again only when the cached copy is older than `ttl`
+    seconds or a token references an unknown `kid`. Concurrent misses are
+    collapsed into a single download, and downloads are attempted at most once
+    every `min_refetch_interval` seconds. When a download fails, the keys
+    already known keep being served until the next attempt succeeds.
+    """
+
+    def __init__(self, http_clients: HttpClientPool, ttl: int = 3600, min_refetch_interval: int = 10):
+        self.http_clients = http_clients
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._jwks_url: str = ""
+        self._fetched_at: float | None = None
+        self._attempted_url: str = ""
+        self._attempted_at: float | None = None
+        self._generation = 0
+        self._fetch_lock = asyncio.Lock()
+
+    async def get(self, jwks_url: str, kid: str) -> jwt.PyJWK:
+        key = self._lookup(jwks_url, kid)
+        if key is not None:
+            return key
+
+        error: Exception | None = None
+        generation = self._generation
+        async with self._fetch_lock:
+            # Another request may have refreshed the keys while we waited
+            if self._generation == generation and self._may_refetch(jwks_url):
+                try:
+                    await self._fetch(jwks_url)
+                except (httpx.HTTPError, ValueError, jwt.PyJWTError) as e:
+                    logger.warning("Failed to refresh the JWKS, keeping the cached keys", exc_info=True)
+                    error = e
+
+            key = self._keys.get(kid) if self._jwks_url == jwks_url else None
+
+        if key is None:
+            if error is not None:
+                raise jwt.PyJWKClientError(f"Failed to get the JWKS: {error}") from error
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+
+        return key
+
+    def _lookup(self, jwks_url: str, kid: str) -> jwt.PyJWK | None:
+        if self._jwks_url != jwks_url or self._fetched_at is None:
+            return None
+
+        if time.monotonic() - self._fetched_at > self.ttl:
+            return None
+
+        return self._keys.get(kid)
+
+    def _may_refetch(self, jwks_url: str) -> bool:
+        if self._attempted_url != jwks_url or self._attempted_at is None:
+            return True
+
+        return time.monotonic() - self._attempted_at > min(self.ttl, self.min_refetch_interval)
+
+    async def _fetch(self, jwks_url: str) -> None:
+        self._attempted_url = jwks_url
+        self._attempted_at = time.monotonic()
+
+        response = await self.http_clients.get(jwks_url)
+        if response.status_code != 200:
+            raise jwt.PyJWKClientError("Failed to get the JWKS: " + response.text)
+
+        jwk_set = jwt.PyJWKSet.from_dict(response.json())
+
+        self._keys = {jwk.key_id: jwk for jwk in jwk_set.keys if jwk.key_id}
+        self._jwks_url = jwks_url
+        self._fetched_at = time.monotonic()
+        self._generation += 1
+
+
 class AuthClient:
-    def __init__(self, oidc_url: str, client_id: str, client_secret: str):
+    """Process-wide OIDC client holding the provider's discovery document.
+
+    The discovery document is fetched once when the client is started and
+    refreshed in the background every `discovery_ttl` seconds, so resolving
+    the provider endpoints never costs a request to the IdP. The hit ratios
+    of the token caches are logged every `cache_stats_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        oidc_url: str,
+        client_id: str,
+        client_secret: str,
+        http_clients: HttpClientPool,
+        audience: str = "",
+        discovery_ttl: int = 3600,
+        jwks_ttl: int = 3600,
+        introspection_cache_ttl: int = 60,
+        introspection_cache_size: int = 10000,
+        claims_cache_ttl: int = 60,
+        claims_cache_size: int = 10000,
+        cache_stats_interval: int = 300,
+    ):
         self.oidc_config_url = oidc_url + "/.well-known/openid-configuration"
         self.client_id = client_id
         self.client_secret = client_secret
         self.basic_auth = (client_id, client_secret)
+        self.http_clients = http_clients
+        self.audience = audience
+        self.discovery_ttl = discovery_ttl
+        self.cache_stats_interval = cache_stats_interval
 
+        self.issuer: str = ""
         self.jwks_url: str = ""
         self.introspection_url: str = ""
         self.userinfo_url: str = ""
-        self._get_urls()
 
-    def _get_urls(self) -> None:
-        try:
-            response = requests.get(self.oidc_config_url)
+        self.signing_keys = SigningKeyCache(http_clients, ttl=jwks_ttl)
+        self.introspection_cache: TTLCache[str, bool] = TTLCache(
+            max_size=introspection_cache_size, ttl=introspection_cache_ttl
+        )
+        self.claims_cache: TTLCache[str, TokenClaims] = TTLCache(
+            max_size=claims_cache_size, ttl=claims_cache_ttl
+        )
+
+        self._loaded_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._background_tasks: list[asyncio.Task] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def refresh(self) -> None:
+        async with self._refresh_lock:
+            response = await self.http_clients.get(self.oidc_config_url)
+            if response.status_code != 200:
+                raise Exception("Failed to get the OIDC configuration: " + response.text)
+
             oidc_config = OIDCConfig.model_validate(response.json())
+            self.issuer = oidc_config.issuer
             self.jwks_url = oidc_config.jwks_uri
             self.introspection_url = oidc_config.introspection_endpoint
             self.userinfo_url = oidc_config.userinfo_endpoint
-        except KeyError:
-            raise Exception("Failed to get JWKS URL from the token info endpoint")
+            self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self) -> None:
+        """Fetches the discovery document if the startup fetch did not succeed."""
+        if not self.is_loaded:
+            await self.refresh()
+
+    async def get_signing_key(self, kid: str) -> jwt.PyJWK:
+        return await self.signing_keys.get(self.jwks_url, kid)
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Failed to load the OIDC configuration, retrying in background")
+
+        self._background_tasks = [
+            asyncio.create_task(self._refresh_periodically()),
+            asyncio.create_task(self._log_cache_stats_periodically()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._background_tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._background_tasks = []
+
+    def log_cache_stats(self) -> None:
+        for name, cache in [("introspection", self.introspection_cache), ("claims", self.claims_cache)]:
+            logger.info(
+                "Token %s cache: %d entries, %d hits, %d misses, hit ratio %.2f",
+                name, len(cache), cache.hits, cache.misses, cache.hit_ratio,
+            )
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            # Retry quickly until the first successful load, then follow the TTL
+            delay = self.discovery_ttl if self.is_loaded else min(self.discovery_ttl, 30)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the OIDC configuration, keeping the previous one")
+
+    async def _log_cache_stats_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.cache_stats_interval)
+            self.log_cache_stats()
 
 
 class AccessToken:
@@ -67,17 +273,28 @@ class AccessToken:
         self.value = value
         self.auth_client = auth_client
 
-        self._user_info: UserInfo | None = None
+        self._claims: TokenClaims | None = None
 
     @property
-    def userinfo(self) -> UserInfo:
-        if self._user_info is None:
-            self._user_info = self.get_userinfo()
+    def claims(self) -> TokenClaims:
+        """Claims loaded by `load_claims`, which the API dependencies await for every token."""
+        if self._claims is None:
+            raise Exception("Token claims were not loaded")
+
+        return self._claims
+
+    async def load_claims(self) -> TokenClaims:
+        if self._claims is None:
+            self._claims = await self.get_claims()
 
-        return self._user_info
+        return self._claims
 
-    def is_expired(self, time_offset: int = 0) -> bool:
-        token_jwt = self.get_data()
+    @property
+    def userinfo(self) -> UserInfo:
+        return self.claims.userinfo
+
+    async def is_expired(self, time_offset: int = 0) -> bool:
+        token_jwt = await self.get_data()
 
         if not token_jwt:
             return True
@@ -87,11 +304,36 @@ class AccessToken:
 
         return False
 
-    def is_valid(self) -> bool:
+    async def is_locally_valid(self) -> bool:
+        """Validates the signature, expiration, issuer and audience without contacting the IdP."""
+        try:
+            token_jwt = await self.get_data()
+        except jwt.PyJWTError:
+            return False
+
+        if not token_jwt or token_jwt.iss != self.auth_client.issuer:
+            return False
+
+        if self.auth_client.audience:
+            audiences = [token_jwt.aud] if isinstance(token_jwt.aud, str) else token_jwt.aud
+            if self.auth_client.audience not in audiences:
+                return False
+
+        return True
+
+    @cached_property
+    def cache_key(self) -> str:
+        return hashlib.sha256(self.value.encode()).hexdigest()
+
+    async def is_valid(self) -> bool:
+        cached_result = self.auth_client.introspection_cache.get(self.cache_key)
+        if cached_result is not None:
+            return cached_result
+
         body = {"token": self.value}
 
-        response = requests.post(
-            self.auth_client.introspection_url, body, auth=self.auth_client.basic_auth
+        response = await self.auth_client.http_clients.post(
+            self.auth_client.introspection_url, data=body, auth=self.auth_client.basic_auth
         )
 
         if response.status_code != 200:
@@ -99,13 +341,36 @@ class AccessToken:
 
         token_info = TokenInfo.model_validate(response.json())
 
-        if token_info.active:
-            return True
+        # A cached result must never outlive the token itself
+        expires_at = token_info.exp or self._get_unverified_expiration()
+        ttl = expires_at - time.time() if expires_at else None
+        self.auth_client.introspection_cache.set(self.cache_key, token_info.active, ttl)
 
-        return False
+        return token_info.active
+
+    def _get_unverified_expiration(self) -> int | None:
+        try:
+            claims = jwt.decode(self.value, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return None
 
-    def get_userinfo(self) -> UserInfo:
-        response = requests.get(
+        return claims.get("exp")
+
+    async def get_claims(self) -> TokenClaims:
+        claims = self.auth_client.claims_cache.get(self.cache_key)
+        if claims is not None:
+            return claims
+
+        claims = TokenClaims(await self.get_userinfo())
+
+        expires_at = self._get_unverified_expiration()
+        ttl = expires_at - time.time() if expires_at else None
+        self.auth_client.claims_cache.set(self.cache_key, claims, ttl)
+
+        return claims
+
+    async def get_userinfo(self) -> UserInfo:
+        response = await self.auth_client.http_clients.get(
             self.auth_client.userinfo_url,
             headers={"Authorization": f"Bearer {self.value}"},
         )
@@ -117,11 +382,10 @@ class AccessToken:
 
         return data
 
-    def get_data(self) -> TokenJWTPayload | None:
-        jwks_client = jwt.PyJWKClient(self.auth_client.jwks_url)
+    async def get_data(self) -> TokenJWTPayload | None:
         header = jwt.get_unverified_header(self.value)
 
-        key = jwks_client.get_signing_key(header["kid"]).key
+        key = (await self.auth_client.get_signing_key(header["kid"])).key
 
         try:
             decoded_jwt = jwt.decode(
@@ -135,37 +399,16 @@ class AccessToken:
         return token_jwt
 
     def get_visas(self) -> list[Visa]:
-        user_info = self.get_userinfo()
-
-        visas: list[Visa] = []
-        for visa in user_info.ga4gh_passport_v1:
-            v = Visa(token=visa)
-            visas.append(v)
-
-        return visas
+        return self.claims.visas
 
     def get_entitlements(self) -> list[str]:
-        user_info = self.get_userinfo()
-
-        return user_info.eduperson_entitlement
+        return self.claims.entitlements
 
     def has_visa(self, type: str, value: str) -> bool:
-        visas = self.get_visas()
-
-        for visa in visas:
-            if visa.type == type and visa.value == value:
-                return True
-
-        return False
+        return self.claims.has_visa(type, value)
 
     def has_entitlement(self, entitlement: str) -> bool:
-        entitlements = self.get_entitlements()
-
-        for entitlement in entitlements:
-            if entitlement == entitlement:
-                return True
-
-        return False
+        return self.claims.has_entitlement(entitlement)
 
     def is_authorized_for_workflow(
         self, workflow_definition: WorkflowDefinitionMetadata
@@ -173,7 +416,15 @@ class AccessToken:
         if self.has_visa("ControlledAccessGrants", str(workflow_definition.id)):
             return True
 
-        if workflow_definition.is_entitlement_satisfied(self.get_entitlements()):
-            return True
+        catalog = get_workflow_definition_catalog()
+        return workflow_definition.id in catalog.get_authorized_ids(self.get_entitlements())
 
-        return False
+    def get_authorized_workflow_definition_ids(self) -> set[UUID]:
+        catalog = get_workflow_definition_catalog()
+
+        authorized_ids = set(catalog.get_authorized_ids(self.get_entitlements()))
+        authorized_ids.update(
+            d.id for d in catalog if self.has_visa("ControlledAccessGrants", str(d.id))
+        )
+
+        return authorized_ids
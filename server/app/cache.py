@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class TTLCache(Generic[KeyT, ValueT]):
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL.
+
+    The cache holds at most `max_size` entries and, when `max_bytes` is set,
+    at most `max_bytes` of the sizes given to `set`; the least recently used
+    entry is evicted first once it is full. A `ttl` of `math.inf` keeps
+    entries until they are evicted. Hits and misses are counted so the
+    effectiveness of the cache can be monitored through `hit_ratio`.
+    """
+
+    def __init__(self, max_size: int, ttl: float, max_bytes: int | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[KeyT, tuple[float, int, ValueT]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: KeyT) -> ValueT | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: KeyT, value: ValueT, ttl: float | None = None, size: int = 0) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._size += size
+
+            while len(self._entries) > self.max_size or (self.max_bytes is not None and self._size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: KeyT) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: KeyT) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
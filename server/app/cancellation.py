@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+from uuid import UUID
+
+import redis
+import redis.asyncio
+
+logger = logging.getLogger(__name__)
+
+
+def get_cancel_channel(workflow_id: UUID | str) -> str:
+    return f"workflow-cancel:{workflow_id}"
+
+
+async def publish_cancellation(redis_url: str, workflow_id: UUID):
+    """Tells the task running the workflow to stop. Failures are only logged,
+    the task still notices the abort through the result backend."""
+    client = redis.asyncio.Redis.from_url(redis_url)
+    try:
+        await client.publish(get_cancel_channel(workflow_id), "cancel")
+    except redis.RedisError:
+        logger.exception("Failed to publish the cancellation of workflow %s", workflow_id)
+    finally:
+        await client.aclose()
+
+
+class CancellationListener:
+    """Receives the cancellation of a workflow published by `publish_cancellation`.
+
+    The subscription is served by a background thread. On cancellation the
+    file descriptor returned by `fileno` becomes readable, so the task can wait
+    for it together with the output of the command it runs.
+    """
+
+    def __init__(self, redis_url: str, workflow_id: UUID | str, poll_interval: float = 1.0):
+        self.redis_url = redis_url
+        self.workflow_id = workflow_id
+        self.poll_interval = poll_interval
+
+        # Created first, so an invalid URL fails before the pipe is opened
+        self._client = redis.Redis.from_url(redis_url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._thread = None
+
+        self._cancelled = threading.Event()
+        # Guards the pipe, so a message arriving while the listener is closed
+        # never writes to a closed, or already reused, file descriptor
+        self._lock = threading.Lock()
+        self._closed = False
+        self._read_fd, self._write_fd = os.pipe()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        # Subscribes before returning, so no message published afterwards is missed
+        self._pubsub.subscribe(**{get_cancel_channel(self.workflow_id): self._on_message})
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=self.poll_interval,
+            daemon=True,
+            exception_handler=self._on_error,
+        )
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.join(self.poll_interval + 1)
+            self._thread = None
+
+        self._pubsub.close()
+        self._client.close()
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+
+    def _on_message(self, message):
+        with self._lock:
+            if self._closed or self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            os.write(self._write_fd, b"\0")
+
+    def _on_error(self, error, pubsub, thread):
+        logger.exception("Cancellation listener of workflow %s failed", self.workflow_id, exc_info=error)
+        thread.stop()
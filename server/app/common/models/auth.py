@@ -33,6 +33,7 @@ class UserInfo(BaseModel):
 
 class TokenInfo(BaseModel):
     active: bool
+    exp: Optional[int] = None
 
 
 class TokenJWTPayload(BaseModel):
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TypeVar
 from pydantic import BaseModel
 
 class Executor(BaseModel):
@@ -27,8 +27,9 @@ class LogEntry(BaseModel):
     end_time: str
     exit_code: int
     start_time: Optional[datetime] = None
-    stderr: str
-    stdout: str
+    # Left out by the BASIC view
+    stderr: Optional[str] = None
+    stdout: Optional[str] = None
 
 
 class Metadata(BaseModel):
@@ -52,4 +53,36 @@ class JobModel(BaseModel):
     inputs: List[InputFile]
     logs: List[LogBlock]
     name: str
-    state: str
\ No newline at end of file
+    state: str
+
+
+class JobSummaryModel(BaseModel):
+    """
+    Subset of JobModel read when only the state of a task is needed. Fields
+    that are not declared are not validated nor turned into Python objects,
+    but the parser still reads the whole payload.
+    """
+    id: str
+    state: str
+    creation_time: datetime
+
+
+class ExecutorLogOutput(BaseModel):
+    stdout: Optional[str] = None
+    stderr: Optional[str] = None
+
+
+class TaskLogOutput(BaseModel):
+    logs: List[ExecutorLogOutput]
+
+
+class JobLogsModel(JobSummaryModel):
+    """
+    Subset of JobModel read to show the output of a task. The lists are
+    required like in JobModel; a default on them makes pydantic-core parse
+    large payloads markedly slower.
+    """
+    logs: List[TaskLogOutput]
+
+
+JobSummaryT = TypeVar("JobSummaryT", bound=JobSummaryModel)
@@ -1,5 +1,6 @@
 import os
-from typing import Tuple, Type
+from functools import cached_property
+from typing import Literal, Optional, Tuple, Type
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, SettingsConfigDict, YamlConfigSettingsSource
 
@@ -17,6 +18,56 @@ class AppConfig(BaseModel):
     oidc_audience: str
 
 
+class AuthConfig(BaseModel):
+    # "introspect" checks every token with the IdP, "local" only verifies the JWT
+    # against the cached JWKS and "local_sampled" additionally introspects a
+    # random sample of requests. Cancel and run requests are always introspected.
+    validation_strategy: Literal["introspect", "local", "local_sampled"] = "introspect"
+    introspection_sample_rate: float = 0.1
+    oidc_discovery_ttl: int = 3600
+    jwks_ttl: int = 3600
+    introspection_cache_ttl: int = 60
+    introspection_cache_size: int = 10000
+    claims_cache_ttl: int = 60
+    claims_cache_size: int = 10000
+    # Seconds between the log lines reporting the hit ratios of the caches
+    cache_stats_interval: int = 300
+
+
+class HttpConfig(BaseModel):
+    max_connections_per_host: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+
+
+class TesConfig(BaseModel):
+    # Bounds the concurrent TES requests of a single API request
+    max_concurrent_requests: int = 16
+    # Seconds a workflow detail waits for its jobs; the jobs that are not
+    # fetched by then are left out. Kept below the web UI's request timeout.
+    request_deadline: float = 4.0
+    # Connection pool and retries of the TES servers, separate from the `http`
+    # settings used for the identity provider
+    max_connections_per_host: int = 32
+    max_keepalive_connections: int = 16
+    keepalive_expiry: float = 30.0
+    timeout: float = 10.0
+    connect_timeout: float = 3.0
+    retries: int = 2
+    retry_backoff: float = 0.2
+    # Tasks in a terminal state are cached for `cache_terminal_ttl` seconds,
+    # unless evicted earlier, running tasks for `cache_running_ttl` seconds.
+    # "redis" shares the cache between the API processes through `cache_redis_url`.
+    cache_backend: Literal["memory", "redis", "none"] = "memory"
+    cache_running_ttl: float = 5.0
+    cache_terminal_ttl: float = 7 * 24 * 3600
+    cache_max_size: int = 10000
+    cache_max_bytes: int = 256 * 1024 * 1024
+    cache_redis_url: Optional[str] = None
+
+
 class SnakemakeConfig(BaseModel):
     snakemake_container_image: str
     snakemake_jobs: int
@@ -33,11 +84,30 @@ class SnakemakeConfig(BaseModel):
 class CeleryConfig(BaseModel):
     broker_url: str
     result_backend: str
+    progress_flush_interval_ms: int = 1000
+    log_flush_interval_ms: int = 1000
+    # Cancellations are pushed to the running task over Redis pub/sub when set;
+    # the task also polls the result backend every `abort_poll_interval_ms` in
+    # case a message is missed, so raise the interval along with setting this
+    cancel_redis_url: Optional[str] = None
+    abort_poll_interval_ms: int = 1000
+
 
+class DatabaseConfig(BaseModel):
+    # "memory" keeps the data in the API process and loses it on restart; it
+    # lets tests and benchmarks run without a MongoDB server
+    backend: Literal["mongo", "memory"] = "mongo"
 
 class MongoConfig(BaseModel):
     mongodb_uri: str
     db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    connect_timeout_ms: int = 20000
+    server_selection_timeout_ms: int = 30000
+    socket_timeout_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
 
 class TESDatasets(BaseModel):
     tes_url: str
@@ -48,8 +118,12 @@ class Config(BaseSettings):
     model_config = SettingsConfigDict(yaml_file=os.environ.get("CONFIG_FILE", "../config.yaml"))
 
     app: AppConfig
+    auth: AuthConfig = AuthConfig()
+    http: HttpConfig = HttpConfig()
+    tes: TesConfig = TesConfig()
     snakemake: SnakemakeConfig
     celery: CeleryConfig
+    database: DatabaseConfig = DatabaseConfig()
     mongo: MongoConfig
     tes_data: list[TESDatasets]
 
@@ -63,6 +137,18 @@ class Config(BaseSettings):
         file_secret_settings: PydanticBaseSettingsSource,
     ) -> Tuple[PydanticBaseSettingsSource, ...]:
         return (env_settings, dotenv_settings, YamlConfigSettingsSource(settings_cls),)
+
+    @cached_property
+    def tes_url_by_dataset(self) -> dict[str, str]:
+        """Index of `tes_data`; a dataset listed for several TES servers runs on the first."""
+        tes_url_by_dataset = {}
+        for tes_datasets in self.tes_data:
+            for dataset in tes_datasets.datasets:
+                tes_url_by_dataset.setdefault(dataset, tes_datasets.tes_url)
+        return tes_url_by_dataset
+
+    def get_tes_url(self, dataset: str) -> str:
+        return self.tes_url_by_dataset.get(dataset, self.snakemake.tes_url)
     
 
 config = Config() # type: ignore
\ No newline at end of file
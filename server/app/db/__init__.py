@@ -1,2 +1,5 @@
 from .base_database import BaseDatabase
-from .mongo_database import MongoDatabase
\ No newline at end of file
+from .async_base_database import AsyncBaseDatabase
+from .mongo_database import MongoDatabase
+from .motor_database import MotorDatabase
+from .memory_database import AsyncMemoryDatabase, MemoryDatabase, MemoryStore
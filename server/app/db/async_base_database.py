@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from typing import Type, TypeVar
+
+from .models import Index, Model
+
+ModelT = TypeVar("ModelT", bound=Model)
+class AsyncBaseDatabase(ABC):
+    """Asyncio counterpart of `BaseDatabase`, used by the API so database I/O does not block the event loop."""
+
+    @abstractmethod
+    async def get_one(self, model: Type[ModelT], filter: dict) -> ModelT | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def insert_one(self, model: Type[ModelT], data: ModelT) -> ModelT:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_one(self, model: Type[ModelT], filter: dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_one(self, model: Type[ModelT], filter: dict, data: ModelT) -> ModelT:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ensure_indexes(self, model: Type[ModelT]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        raise NotImplementedError
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Type, TypeVar
 
-from .models import Model
+from .models import Index, Model
 
 ModelT = TypeVar("ModelT", bound=Model)
 class BaseDatabase(ABC):
@@ -10,7 +10,19 @@ class BaseDatabase(ABC):
         raise NotImplementedError
     
     @abstractmethod
-    def get_many(self, model: Type[ModelT], filter: dict) -> list[ModelT]:
+    def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
+        """
+        Retrieves the records matching the filter. `projection` restricts the
+        fields read to the given model fields, so `model` may be a partial view
+        of the stored records. `sort` is a list of (field, direction) pairs.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -25,4 +37,28 @@ class BaseDatabase(ABC):
     def update_one(self, model: Type[ModelT], filter: dict, data: ModelT) -> ModelT:
         raise NotImplementedError
 
+    @abstractmethod
+    def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        """
+        Atomically updates single fields of the record matching the filter without
+        reading it back: `set` assigns values, `inc` increments numbers and `push`
+        appends the listed values to array fields. Returns whether a record matched,
+        so conditions in the filter can be used for conditional updates.
+        """
+        raise NotImplementedError
 
+    @abstractmethod
+    def ensure_indexes(self, model: Type[ModelT]):
+        """Creates the indexes declared by the model; existing indexes are left untouched."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        raise NotImplementedError
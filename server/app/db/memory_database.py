@@ -0,0 +1,278 @@
+import copy
+import threading
+from datetime import UTC, datetime
+from typing import Any, Type, TypeVar
+
+from pymongo.errors import DuplicateKeyError
+
+from .async_base_database import AsyncBaseDatabase
+from .base_database import BaseDatabase
+from .models import Index, Model
+from .translation import FieldTranslationMixin
+
+ModelT = TypeVar("ModelT", bound=Model)
+
+_COMPARISONS = {
+    "$lt": lambda value, operand: value < operand,
+    "$lte": lambda value, operand: value <= operand,
+    "$gt": lambda value, operand: value > operand,
+    "$gte": lambda value, operand: value >= operand,
+}
+
+
+def _to_stored(value: Any) -> Any:
+    """Converts a value the way a round trip through BSON would: datetimes become naive UTC."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    if isinstance(value, dict):
+        return {key: _to_stored(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_stored(v) for v in value]
+    return value
+
+
+def _matches(document: dict, filter: dict) -> bool:
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_matches(document, f) for f in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, f) for f in condition):
+                return False
+        elif key == "$nor":
+            if any(_matches(document, f) for f in condition):
+                return False
+        elif not _matches_field(key in document, document.get(key), condition):
+            return False
+    return True
+
+
+def _matches_field(exists: bool, value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return _equals(value, condition)
+
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            matched = _equals(value, operand)
+        elif operator == "$ne":
+            matched = not _equals(value, operand)
+        elif operator == "$in":
+            matched = any(_equals(value, o) for o in operand)
+        elif operator == "$nin":
+            matched = not any(_equals(value, o) for o in operand)
+        elif operator == "$exists":
+            matched = exists == bool(operand)
+        elif operator in _COMPARISONS:
+            try:
+                matched = value is not None and _COMPARISONS[operator](value, operand)
+            except TypeError:
+                matched = False
+        else:
+            raise ValueError(f"Unsupported filter operator {operator}")
+
+        if not matched:
+            return False
+    return True
+
+
+def _equals(value: Any, operand: Any) -> bool:
+    # Like in MongoDB, an array field matches when one of its elements does
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+
+class MemoryStore:
+    """Collections of documents shared by the `MemoryDatabase` instances of a process."""
+
+    def __init__(self):
+        self.collections: dict[str, dict[Any, dict]] = {}
+        self.indexes: dict[str, list[list[tuple[str, int]]]] = {}
+        self.lock = threading.RLock()
+
+    def clear(self):
+        with self.lock:
+            self.collections.clear()
+            self.indexes.clear()
+
+
+class MemoryDatabase(FieldTranslationMixin, BaseDatabase):
+    """
+    Thread-safe in-memory backend with the query and update semantics the
+    repositories rely on. Data lives only as long as the process, so it is
+    meant for tests, benchmarks and running the API without a MongoDB server.
+    """
+
+    def __init__(self, store: MemoryStore | None = None):
+        self.store = store or MemoryStore()
+
+    def get_one(self, model: Type[ModelT], filter: dict) -> ModelT | None:
+        with self.store.lock:
+            document = self._find_one(model, self._translate_filter_keys(model, filter))
+            document = copy.deepcopy(document)
+
+        if document is None:
+            return None
+
+        return model.model_validate(document)
+
+    def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
+        filter = _to_stored(self._translate_filter_keys(model, filter))
+
+        with self.store.lock:
+            documents = [
+                document for document in self._collection(model).values()
+                if _matches(document, filter)
+            ]
+
+            # Stable sorts applied from the last key to the first give a multi-key sort
+            for key, direction in reversed(self._translate_sort(model, sort or [])):
+                documents.sort(key=lambda document: (document.get(key) is not None, document.get(key)), reverse=direction < 0)
+
+            if limit:
+                documents = documents[:limit]
+
+            db_projection = self._translate_projection(model, projection)
+            if db_projection:
+                documents = [
+                    {key: value for key, value in document.items() if key in db_projection or key == "_id"}
+                    for document in documents
+                ]
+            documents = copy.deepcopy(documents)
+
+        return [model.model_validate(document) for document in documents]
+
+    def insert_one(self, model: Type[ModelT], data: ModelT) -> ModelT:
+        document = _to_stored(data.model_dump(by_alias=True))
+
+        with self.store.lock:
+            collection = self._collection(model)
+            if document["_id"] in collection:
+                raise DuplicateKeyError(f"Duplicate key {document['_id']} in {model._collection_name}")
+            collection[document["_id"]] = document
+            document = copy.deepcopy(document)
+
+        return model.model_validate(document)
+
+    def delete_one(self, model: Type[ModelT], filter: dict):
+        with self.store.lock:
+            document = self._find_one(model, self._translate_filter_keys(model, filter))
+            if document is not None:
+                del self._collection(model)[document["_id"]]
+
+    def update_one(self, model: Type[ModelT], filter: dict, data: ModelT) -> ModelT:
+        with self.store.lock:
+            document = self._find_one(model, self._translate_filter_keys(model, filter))
+            if document is not None:
+                document.update(_to_stored(data.model_dump(by_alias=True)))
+            document = copy.deepcopy(document)
+
+        return model.model_validate(document)
+
+    def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        update = _to_stored(self._build_update(model, set, inc, push))
+
+        with self.store.lock:
+            document = self._find_one(model, self._translate_filter_keys(model, filter))
+            if document is None:
+                return False
+
+            document.update(update.get("$set", {}))
+            for key, value in update.get("$inc", {}).items():
+                document[key] = document.get(key, 0) + value
+            for key, values in update.get("$push", {}).items():
+                document[key] = document.get(key, []) + values["$each"]
+
+        return True
+
+    def ensure_indexes(self, model: Type[ModelT]):
+        with self.store.lock:
+            indexes = self.store.indexes.setdefault(model._collection_name, [])
+            for index in model._indexes:
+                keys = self._translate_index_keys(model, index)
+                if keys not in indexes:
+                    indexes.append(keys)
+
+    def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        with self.store.lock:
+            existing_keys = list(self.store.indexes.get(model._collection_name, []))
+
+        return [
+            index for index in model._indexes
+            if self._translate_index_keys(model, index) not in existing_keys
+        ]
+
+    def _collection(self, model: Type[ModelT]) -> dict[Any, dict]:
+        return self.store.collections.setdefault(model._collection_name, {})
+
+    def _find_one(self, model: Type[ModelT], filter: dict) -> dict | None:
+        filter = _to_stored(filter)
+
+        # Lookups by ID skip the scan, like the _id index would
+        if "_id" in filter and not isinstance(filter["_id"], dict):
+            document = self._collection(model).get(filter["_id"])
+            return document if document is not None and _matches(document, filter) else None
+
+        for document in self._collection(model).values():
+            if _matches(document, filter):
+                return document
+        return None
+
+
+class AsyncMemoryDatabase(AsyncBaseDatabase):
+    """Asyncio interface of `MemoryDatabase`. The operations never block, so they run inline."""
+
+    def __init__(self, store: MemoryStore | None = None):
+        self.db = MemoryDatabase(store)
+
+    async def get_one(self, model: Type[ModelT], filter: dict) -> ModelT | None:
+        return self.db.get_one(model, filter)
+
+    async def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
+        return self.db.get_many(model, filter, projection, sort, limit)
+
+    async def insert_one(self, model: Type[ModelT], data: ModelT) -> ModelT:
+        return self.db.insert_one(model, data)
+
+    async def delete_one(self, model: Type[ModelT], filter: dict):
+        self.db.delete_one(model, filter)
+
+    async def update_one(self, model: Type[ModelT], filter: dict, data: ModelT) -> ModelT:
+        return self.db.update_one(model, filter, data)
+
+    async def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        return self.db.update_fields(model, filter, set, inc, push)
+
+    async def ensure_indexes(self, model: Type[ModelT]):
+        self.db.ensure_indexes(model)
+
+    async def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        return self.db.get_missing_indexes(model)
@@ -1,2 +1,4 @@
 from .model import *
-from .workflow import *
\ No newline at end of file
+from .workflow import *
+
+all_models: list[type[Model]] = [WorkflowModel]
@@ -1,11 +1,22 @@
 from typing import ClassVar
 from pydantic import BaseModel
 
+ASCENDING = 1
+DESCENDING = -1
+
+
+class Index(BaseModel):
+    """Index declared by a model; `keys` are (model field name, direction) pairs."""
+    keys: list[tuple[str, int]]
+    unique: bool = False
+
+
 class Model(BaseModel):
     _collection_name: ClassVar[str]  # Subclasses must define this
+    _indexes: ClassVar[list[Index]] = []
 
     def __new__(cls, *args, **kwargs):
         """Ensures subclasses define '_collection_name' before instantiation."""
         if "_collection_name" not in cls.__dict__ or not isinstance(cls.__dict__["_collection_name"], str):
             raise TypeError(f"{cls.__name__} must define a '_collection_name' string attribute.")
-        return super().__new__(cls)
\ No newline at end of file
+        return super().__new__(cls)
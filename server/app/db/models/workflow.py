@@ -3,11 +3,15 @@ from pydantic import ConfigDict, Field
 from uuid import UUID
 
 from app.common import WorkflowState
-from .model import Model
+from .model import ASCENDING, DESCENDING, Index, Model
 
 
 class WorkflowModel(Model):
     _collection_name = "workflow"
+    _indexes = [
+        Index(keys=[("created_by", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        Index(keys=[("task_id", ASCENDING)]),
+    ]
 
     id: UUID = Field(..., alias="_id")
     task_id: str = Field(...)
@@ -17,5 +21,20 @@ class WorkflowModel(Model):
     finished_jobs: int = 0
     state: WorkflowState = WorkflowState.UNKNOWN
     job_ids: list[str] = Field(default_factory=list)
+    # TES server running the jobs; None for workflows stored before it was recorded
+    tes_url: str | None = None
+
+    model_config = ConfigDict(populate_by_name=True, use_enum_values=True)
+
+
+class WorkflowListModel(Model):
+    """Subset of WorkflowModel read when listing workflows."""
+    _collection_name = "workflow"
+
+    id: UUID = Field(..., alias="_id")
+    created_at: datetime
+    state: WorkflowState = WorkflowState.UNKNOWN
+    total_jobs: int = 0
+    finished_jobs: int = 0
 
     model_config = ConfigDict(populate_by_name=True, use_enum_values=True)
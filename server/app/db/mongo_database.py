@@ -2,10 +2,11 @@ from typing import Type, TypeVar
 from pymongo.database import Database
 
 from .base_database import BaseDatabase
-from .models import Model
+from .models import Index, Model
+from .translation import FieldTranslationMixin
 
 ModelT = TypeVar("ModelT", bound=Model)
-class MongoDatabase(BaseDatabase):
+class MongoDatabase(FieldTranslationMixin, BaseDatabase):
     def __init__(self, db: Database):
         self.db = db
 
@@ -18,10 +19,22 @@ class MongoDatabase(BaseDatabase):
         
         return model.model_validate(result)
 
-    def get_many(self, model: Type[ModelT], filter: dict) -> list[ModelT]:
+    def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
         filter = self._translate_filter_keys(model, filter)
-        result = self.db[model._collection_name].find(filter)
-        return [model.model_validate(r) for r in result]
+        cursor = self.db[model._collection_name].find(filter, self._translate_projection(model, projection))
+        if sort:
+            cursor = cursor.sort(self._translate_sort(model, sort))
+        if limit:
+            cursor = cursor.limit(limit)
+
+        return [model.model_validate(r) for r in cursor]
 
     def insert_one(self, model: Type[ModelT], data: ModelT) -> ModelT:
         insert_result = self.db[model._collection_name].insert_one(data.model_dump(by_alias=True))
@@ -38,18 +51,31 @@ class MongoDatabase(BaseDatabase):
         result = self.db[model._collection_name].find_one(filter)
         return model.model_validate(result)
 
-    def _translate_filter_keys(self, model: Type[ModelT], filter: dict) -> dict:
-        """
-        Translates filter keys from model field names to database field names (aliases)
-        if an alias is defined for that field in the Pydantic model.
-        """
-        db_filter = {}
-        model_fields = model.model_fields
-
-        for key, value in filter.items():
-            field_info = model_fields.get(key)
-            if field_info and field_info.alias:
-                db_filter[field_info.alias] = value
-            else:
-                db_filter[key] = value
-        return db_filter
\ No newline at end of file
+    def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        update = self._build_update(model, set, inc, push)
+        filter = self._translate_filter_keys(model, filter)
+        result = self.db[model._collection_name].update_one(filter, update)
+        return result.matched_count > 0
+
+    def ensure_indexes(self, model: Type[ModelT]):
+        collection = self.db[model._collection_name]
+        for index in model._indexes:
+            collection.create_index(self._translate_index_keys(model, index), unique=index.unique)
+
+    def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        existing_keys = [
+            [(key, int(direction)) for key, direction in info["key"]]
+            for info in self.db[model._collection_name].index_information().values()
+        ]
+
+        return [
+            index for index in model._indexes
+            if self._translate_index_keys(model, index) not in existing_keys
+        ]
@@ -0,0 +1,82 @@
+from typing import Type, TypeVar
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from .async_base_database import AsyncBaseDatabase
+from .models import Index, Model
+from .translation import FieldTranslationMixin
+
+ModelT = TypeVar("ModelT", bound=Model)
+class MotorDatabase(FieldTranslationMixin, AsyncBaseDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def get_one(self, model: Type[ModelT], filter: dict) -> ModelT | None:
+        filter = self._translate_filter_keys(model, filter)
+        result = await self.db[model._collection_name].find_one(filter)
+
+        if result is None:
+            return None
+
+        return model.model_validate(result)
+
+    async def get_many(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        projection: list[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int | None = None,
+    ) -> list[ModelT]:
+        filter = self._translate_filter_keys(model, filter)
+        cursor = self.db[model._collection_name].find(filter, self._translate_projection(model, projection))
+        if sort:
+            cursor = cursor.sort(self._translate_sort(model, sort))
+        if limit:
+            cursor = cursor.limit(limit)
+
+        return [model.model_validate(r) async for r in cursor]
+
+    async def insert_one(self, model: Type[ModelT], data: ModelT) -> ModelT:
+        insert_result = await self.db[model._collection_name].insert_one(data.model_dump(by_alias=True))
+        result = await self.db[model._collection_name].find_one({"_id": insert_result.inserted_id})
+        return model.model_validate(result)
+
+    async def delete_one(self, model: Type[ModelT], filter: dict):
+        filter = self._translate_filter_keys(model, filter)
+        await self.db[model._collection_name].delete_one(filter)
+
+    async def update_one(self, model: Type[ModelT], filter: dict, data: ModelT) -> ModelT:
+        filter = self._translate_filter_keys(model, filter)
+        await self.db[model._collection_name].update_one(filter, {"$set": data.model_dump(by_alias=True)})
+        result = await self.db[model._collection_name].find_one(filter)
+        return model.model_validate(result)
+
+    async def update_fields(
+        self,
+        model: Type[ModelT],
+        filter: dict,
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> bool:
+        update = self._build_update(model, set, inc, push)
+        filter = self._translate_filter_keys(model, filter)
+        result = await self.db[model._collection_name].update_one(filter, update)
+        return result.matched_count > 0
+
+    async def ensure_indexes(self, model: Type[ModelT]):
+        collection = self.db[model._collection_name]
+        for index in model._indexes:
+            await collection.create_index(self._translate_index_keys(model, index), unique=index.unique)
+
+    async def get_missing_indexes(self, model: Type[ModelT]) -> list[Index]:
+        index_information = await self.db[model._collection_name].index_information()
+        existing_keys = [
+            [(key, int(direction)) for key, direction in info["key"]]
+            for info in index_information.values()
+        ]
+
+        return [
+            index for index in model._indexes
+            if self._translate_index_keys(model, index) not in existing_keys
+        ]
@@ -0,0 +1,62 @@
+from typing import Type, TypeVar
+
+from .models import Index, Model
+
+ModelT = TypeVar("ModelT", bound=Model)
+
+
+class FieldTranslationMixin:
+    """Translates model field names to database field names (aliases) in queries."""
+
+    def _translate_filter_keys(self, model: Type[ModelT], filter: dict) -> dict:
+        """
+        Translates filter keys from model field names to database field names (aliases)
+        if an alias is defined for that field in the Pydantic model.
+        """
+        db_filter = {}
+        for key, value in filter.items():
+            if key in ("$and", "$or", "$nor"):
+                db_filter[key] = [self._translate_filter_keys(model, f) for f in value]
+            else:
+                db_filter[self._translate_key(model, key)] = value
+        return db_filter
+
+    def _translate_key(self, model: Type[ModelT], key: str) -> str:
+        field_info = model.model_fields.get(key)
+        if field_info and field_info.alias:
+            return field_info.alias
+        return key
+
+    def _translate_projection(self, model: Type[ModelT], projection: list[str] | None) -> dict | None:
+        if not projection:
+            return None
+        return {self._translate_key(model, key): 1 for key in projection}
+
+    def _translate_sort(self, model: Type[ModelT], sort: list[tuple[str, int]]) -> list[tuple[str, int]]:
+        return [(self._translate_key(model, key), direction) for key, direction in sort]
+
+    def _translate_index_keys(self, model: Type[ModelT], index: Index) -> list[tuple[str, int]]:
+        return self._translate_sort(model, index.keys)
+
+    def _build_update(
+        self,
+        model: Type[ModelT],
+        set: dict | None = None,
+        inc: dict | None = None,
+        push: dict[str, list] | None = None,
+    ) -> dict:
+        """Builds a MongoDB update document from the `update_fields` arguments."""
+        update = {}
+        if set:
+            update["$set"] = self._translate_filter_keys(model, set)
+        if inc:
+            update["$inc"] = self._translate_filter_keys(model, inc)
+        if push:
+            update["$push"] = {
+                self._translate_key(model, key): {"$each": values} for key, values in push.items()
+            }
+
+        if not update:
+            raise ValueError("No fields to update")
+
+        return update
@@ -0,0 +1,73 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class HttpClientPool:
+    """Keep-alive `httpx.AsyncClient`s shared by the whole process, one per host.
+
+    Every host gets its own connection pool, so the connection limit applies
+    per host and a slow host cannot exhaust the connections of the others.
+    GET requests failing with a connection error or a 5xx response are retried
+    up to `retries` times, waiting `retry_backoff` seconds doubled on each retry.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        retries: int = 0,
+        retry_backoff: float = 0.5,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._clients[origin] = client
+
+        return client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        client = self.get_client(url)
+
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(url, **kwargs)
+                if response.status_code < 500 or attempt >= self.retries:
+                    return response
+                await response.aclose()
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+
+            await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+            attempt += 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.get_client(url).post(url, **kwargs)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        for client in clients:
+            await client.aclose()
@@ -0,0 +1,142 @@
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Type
+
+import redis.asyncio as redis
+from pydantic import ValidationError
+
+from .cache import TTLCache
+from .common.models import JobLogsModel, JobSummaryModel, JobSummaryT
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = frozenset({"COMPLETE", "EXECUTOR_ERROR", "SYSTEM_ERROR", "CANCELED"})
+
+
+class JobCache(ABC):
+    """
+    Cache of the TES tasks read by `JobRepository`, keyed by the task URL.
+
+    A task in a terminal state never changes, so it is kept for the long
+    `terminal_ttl`; a task that may still change expires after `running_ttl`
+    seconds.
+    """
+
+    def __init__(self, running_ttl: float, terminal_ttl: float = math.inf):
+        self.running_ttl = running_ttl
+        self.terminal_ttl = terminal_ttl
+
+    def get_ttl(self, job: JobSummaryModel) -> float:
+        return self.terminal_ttl if job.state in TERMINAL_STATES else self.running_ttl
+
+    @abstractmethod
+    async def get(self, key: str, model: Type[JobSummaryT]) -> JobSummaryT | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, keys: list[str], model: Type[JobSummaryT]) -> dict[str, JobSummaryT]:
+        """Looks all the `keys` up at once and returns the jobs found by key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, job: JobSummaryModel):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryJobCache(JobCache):
+    """Job cache of a single process, bounded by entries and by the size of the job logs."""
+
+    def __init__(self, running_ttl: float, max_size: int, max_bytes: int, terminal_ttl: float = math.inf):
+        super().__init__(running_ttl, terminal_ttl)
+        self.cache: TTLCache[str, JobSummaryModel] = TTLCache(max_size, math.inf, max_bytes=max_bytes)
+
+    async def get(self, key: str, model: Type[JobSummaryT]) -> JobSummaryT | None:
+        job = self.cache.get(key)
+        return job if isinstance(job, model) else None
+
+    async def get_many(self, keys: list[str], model: Type[JobSummaryT]) -> dict[str, JobSummaryT]:
+        jobs = {}
+        for key in keys:
+            job = await self.get(key, model)
+            if job is not None:
+                jobs[key] = job
+        return jobs
+
+    async def set(self, key: str, job: JobSummaryModel):
+        self.cache.set(key, job, ttl=self.get_ttl(job), size=self._get_size(job))
+
+    def _get_size(self, job: JobSummaryModel) -> int:
+        # The logs dominate the size of a job, the other fields are estimated
+        size = 256
+        if isinstance(job, JobLogsModel):
+            for task_log in job.logs:
+                for executor_log in task_log.logs:
+                    size += len(executor_log.stdout or "") + len(executor_log.stderr or "")
+        return size
+
+
+class RedisJobCache(JobCache):
+    """
+    Job cache shared by all API processes. The Redis server should still
+    evict with an LRU `maxmemory-policy`, since terminal tasks are kept for
+    the long `terminal_ttl`. Redis errors are logged and treated as cache
+    misses, and so are entries that no longer match the model, for example
+    after an upgrade; those are deleted.
+    """
+
+    def __init__(self, running_ttl: float, redis_url: str, terminal_ttl: float = math.inf):
+        super().__init__(running_ttl, terminal_ttl)
+        self.redis = redis.Redis.from_url(redis_url)
+
+    async def get(self, key: str, model: Type[JobSummaryT]) -> JobSummaryT | None:
+        return (await self.get_many([key], model)).get(key)
+
+    async def get_many(self, keys: list[str], model: Type[JobSummaryT]) -> dict[str, JobSummaryT]:
+        if not keys:
+            return {}
+
+        try:
+            raws = await self.redis.mget([self._redis_key(key) for key in keys])
+        except redis.RedisError:
+            logger.exception("Failed to read TES tasks from the cache")
+            return {}
+
+        jobs = {}
+        invalid_keys = []
+        for key, raw in zip(keys, raws):
+            if raw is None:
+                continue
+            try:
+                jobs[key] = model.model_validate_json(raw)
+            except ValidationError:
+                invalid_keys.append(self._redis_key(key))
+
+        if invalid_keys:
+            logger.warning("Deleting %d cached TES tasks that do not match %s", len(invalid_keys), model.__name__)
+            try:
+                await self.redis.delete(*invalid_keys)
+            except redis.RedisError:
+                logger.exception("Failed to delete TES tasks from the cache")
+
+        return jobs
+
+    async def set(self, key: str, job: JobSummaryModel):
+        ttl = self.get_ttl(job)
+        try:
+            await self.redis.set(
+                self._redis_key(key),
+                job.model_dump_json(),
+                px=None if ttl == math.inf else max(int(ttl * 1000), 1),
+            )
+        except redis.RedisError:
+            logger.exception("Failed to write TES task to the cache")
+
+    async def close(self):
+        await self.redis.aclose()
+
+    def _redis_key(self, key: str) -> str:
+        return f"tes-task:{key}"
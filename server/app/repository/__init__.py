@@ -1,2 +1,3 @@
 from .job_repository import *
-from .workflow_repository import *
\ No newline at end of file
+from .workflow_repository import *
+from .async_workflow_repository import *
\ No newline at end of file
@@ -0,0 +1,170 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+from app.common import WorkflowState
+from app.schemas import JobLogs, WorkflowListItem, WorkflowListPage, WorkflowDetail
+from app.db.models import DESCENDING, WorkflowListModel, WorkflowModel
+from app.db import AsyncBaseDatabase
+from app.repository.job_repository import JobRepository
+from app.auth import AccessToken
+
+
+class InvalidCursor(Exception):
+    """Raised when a workflow list cursor cannot be decoded"""
+
+
+def encode_cursor(created_at: datetime, workflow_id: UUID) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{workflow_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, workflow_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(workflow_id)
+    except ValueError:
+        raise InvalidCursor
+
+
+LIST_PROJECTION = list(WorkflowListModel.model_fields)
+LIST_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+
+def build_list_filter(username: str, cursor: str | None, states: list[WorkflowState] | None) -> dict:
+    filter: dict = {"created_by": username}
+
+    if states:
+        filter["state"] = {"$in": [WorkflowState(s).value for s in states]}
+
+    if cursor:
+        created_at, workflow_id = decode_cursor(cursor)
+        filter["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": workflow_id}},
+        ]
+
+    return filter
+
+
+def build_list_page(workflows: list[WorkflowListModel], limit: int) -> WorkflowListPage:
+    next_cursor = None
+    if len(workflows) > limit:
+        workflows = workflows[:limit]
+        next_cursor = encode_cursor(workflows[-1].created_at, workflows[-1].id)
+
+    res = []
+    for workflow in workflows:
+        workflow_res = WorkflowListItem(
+            id=workflow.id,
+            created_at=workflow.created_at,
+            state=workflow.state,
+            total_jobs=workflow.total_jobs,
+            finished_jobs=workflow.finished_jobs,
+        )
+
+        res.append(workflow_res)
+
+    return WorkflowListPage(items=res, next_cursor=next_cursor)
+
+
+class AsyncWorkflowRepository:
+    """
+    Workflows loaded by `get` are kept in an identity map for the lifetime of
+    the repository, so a workflow is fetched from the database at most once
+    per request no matter how many of its fields the request needs. The API
+    creates a new repository for every request.
+    """
+
+    def __init__(self, db: AsyncBaseDatabase, job_repository: JobRepository):
+        self.db = db
+        self.job_repository = job_repository
+
+        self._identity_map: dict[UUID, WorkflowModel | None] = {}
+
+    async def get_detail(self, workflow_id: UUID, token: AccessToken) -> WorkflowDetail | None:
+        workflow_model = await self.get(workflow_id)
+
+        if not workflow_model:
+            return None
+
+        return WorkflowDetail(
+            id=workflow_model.id,
+            created_at=workflow_model.created_at,
+            state=workflow_model.state,
+            jobs=await self.job_repository.for_endpoint(workflow_model.tes_url).get_list(workflow_model.job_ids, token),
+        )
+
+    async def get_job_logs(
+        self,
+        workflow_id: UUID,
+        job_id: str,
+        token: AccessToken,
+        stream: str = "stdout",
+        tail: int | None = None,
+        offset: int = 0,
+        length: int | None = None,
+    ) -> JobLogs | None:
+        workflow_model = await self.get(workflow_id)
+
+        # Only the jobs of the workflow may be read, not any task of the TES server
+        if not workflow_model or job_id not in workflow_model.job_ids:
+            return None
+
+        return await self.job_repository.for_endpoint(workflow_model.tes_url).get_logs(job_id, token, stream, tail, offset, length)
+
+    async def get_owner(self, workflow_id: UUID) -> str | None:
+        workflow_model = await self.get(workflow_id)
+
+        if not workflow_model:
+            return None
+
+        return workflow_model.created_by
+
+    async def get_task_id(self, workflow_id: UUID) -> str | None:
+        workflow_model = await self.get(workflow_id)
+
+        if not workflow_model:
+            return None
+
+        return workflow_model.task_id
+
+    async def get_list_by_user(
+        self,
+        username: str,
+        limit: int,
+        cursor: str | None = None,
+        states: list[WorkflowState] | None = None,
+    ) -> WorkflowListPage:
+        """
+        Returns the user's workflows, newest first, one page at a time. The page
+        continues after the workflow encoded in `cursor` (keyset pagination on
+        `(created_at, id)`), so deep pages cost the same as the first one.
+        """
+        # One extra workflow tells whether there is a next page
+        workflows = await self.db.get_many(
+            WorkflowListModel,
+            build_list_filter(username, cursor, states),
+            projection=LIST_PROJECTION,
+            sort=LIST_SORT,
+            limit=limit + 1,
+        )
+
+        return build_list_page(workflows, limit)
+
+    async def cancel(self, workflow_id: UUID):
+        await self.db.update_fields(WorkflowModel, {"id": workflow_id}, set={"state": WorkflowState.CANCELED.value})
+
+        workflow_model = self._identity_map.get(workflow_id)
+        if workflow_model is not None:
+            workflow_model.state = WorkflowState.CANCELED
+
+    async def get(self, workflow_id: UUID) -> WorkflowModel | None:
+        if workflow_id not in self._identity_map:
+            self._identity_map[workflow_id] = await self.db.get_one(WorkflowModel, {"id": workflow_id})
+
+        return self._identity_map[workflow_id]
+
+    async def update(self, workflow: WorkflowModel):
+        self._identity_map[workflow.id] = await self.db.update_one(WorkflowModel, {"id": workflow.id}, workflow)
+
+    async def save(self, workflow: WorkflowModel):
+        self._identity_map[workflow.id] = await self.db.insert_one(WorkflowModel, workflow)
@@ -1,73 +1,199 @@
-import requests
-from app.common.models import JobModel
-from app.schemas import JobDetail, JobListItem
+import asyncio
+import copy
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+from app.common.models import JobLogsModel, JobSummaryModel
+from app.http_client import HttpClientPool
+from app.job_cache import JobCache
+from app.schemas import JobListItem, JobLogs
 from app.auth import AccessToken
 
+logger = logging.getLogger(__name__)
+
+ItemT = TypeVar("ItemT")
+
 
 class JobRepository:
-    def __init__(self, tes_api_url: str):
+    """
+    Reads the jobs of a workflow from TES. Lists of jobs are fetched
+    concurrently, at most `max_concurrency` at a time, and whatever has not
+    arrived within `deadline` seconds is left out of the result. Tasks read
+    from TES are stored in `cache` when one is given.
+
+    `tes_api_url` is the server used by default; `for_endpoint` returns a
+    repository reading from another TES server that shares the connection
+    pools and the cache of this one.
+    """
+
+    def __init__(
+        self,
+        tes_api_url: str,
+        http_clients: HttpClientPool,
+        max_concurrency: int = 16,
+        deadline: float | None = None,
+        cache: JobCache | None = None,
+    ):
         self.tes_api_url = tes_api_url
+        self.http_clients = http_clients
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.cache = cache
+
+    def for_endpoint(self, tes_api_url: str | None) -> "JobRepository":
+        if not tes_api_url or tes_api_url == self.tes_api_url:
+            return self
 
-    def get_detail(self, job_id: str, token: AccessToken) -> JobDetail | None:
-        job_model = self._get_model(job_id, token, list_view=False)
+        job_repository = copy.copy(self)
+        job_repository.tes_api_url = tes_api_url
+        return job_repository
+
+    async def get_logs(
+        self,
+        job_id: str,
+        token: AccessToken,
+        stream: str = "stdout",
+        tail: int | None = None,
+        offset: int = 0,
+        length: int | None = None,
+    ) -> JobLogs | None:
+        """
+        Returns the last `tail` lines of the log, or else `length` bytes of it
+        starting at byte `offset`.
+        """
+        job_model = await self._get_model(job_id, token, list_view=False)
         if not job_model:
             return None
 
+        log = ""
         if len(job_model.logs) > 0 and len(job_model.logs[0].logs) > 0:
-            job_logs = job_model.logs[0].logs[0].stdout
-        else:
-            job_logs = ""
+            log = getattr(job_model.logs[0].logs[0], stream) or ""
+        data = log.encode()
+
+        if tail is not None:
+            # Searching back for line breaks avoids splitting large logs into lines
+            offset = len(data) - 1 if data.endswith(b"\n") else len(data)
+            for _ in range(tail):
+                offset = data.rfind(b"\n", 0, offset)
+                if offset < 0:
+                    break
+            offset += 1
+            length = None
+        offset = min(offset, len(data))
+        end = len(data) if length is None else offset + length
 
-        return JobDetail(
+        return JobLogs(
             id=job_model.id,
-            created_at=job_model.creation_time,
-            state=job_model.state,
-            logs=job_logs,
+            stream=stream,
+            content=data[offset:end].decode(errors="replace"),
+            offset=offset,
+            size=len(data),
         )
-    
-    def get_list_item(self, job_id: str, token: AccessToken) -> JobListItem | None:
-        job_model = self._get_model(job_id, token, list_view=True)
 
-        if not job_model:
-            return None
+    async def get_list(self, job_ids: list[str], token: AccessToken) -> list[JobListItem]:
+        job_models = await self._get_models(job_ids, token, list_view=True)
+        return [self._to_list_item(job_model) for job_model in job_models]
 
+    def _to_list_item(self, job_model: JobSummaryModel) -> JobListItem:
         return JobListItem(
             id=job_model.id,
             created_at=job_model.creation_time,
             state=job_model.state
         )
 
-    def get_list(self, job_ids: list[str], token: AccessToken) -> list[JobListItem]:
-        job_list = []
-        for job_id in job_ids:
-            job_list_item = self.get_list_item(job_id, token)
-            if job_list_item:
-                job_list.append(job_list_item)
-        
-        return job_list
-    
-    def get_detail_list(self, job_ids: list[str], token: AccessToken) -> list[JobDetail]:
+    async def _get_models(self, job_ids: list[str], token: AccessToken, list_view: bool) -> list[JobSummaryModel]:
+        """
+        Reads the tasks from the cache in one batch and fetches the rest
+        concurrently. The result is in the order of `job_ids`; tasks that could
+        not be read are left out.
+        """
+        job_models: dict[str, JobSummaryModel] = {}
+
+        if self.cache is not None:
+            task_urls = {self._task_url(job_id, list_view): job_id for job_id in job_ids}
+            cached = await self.cache.get_many(list(task_urls), self._model_class(list_view))
+            job_models.update((task_urls[task_url], job_model) for task_url, job_model in cached.items())
+
+        missing = [job_id for job_id in job_ids if job_id not in job_models]
+
+        # The cache was already consulted for all of them above
+        fetch = lambda job_id: self._get_model(job_id, token, list_view, check_cache=False)
+        for job_model in await self._fetch_all(missing, fetch, self.deadline):
+            job_models[job_model.id] = job_model
+
+        return [job_models[job_id] for job_id in job_ids if job_id in job_models]
+
+    async def _fetch_all(
+        self,
+        job_ids: list[str],
+        fetch: Callable[[str], Awaitable[ItemT | None]],
+        deadline: float | None = None,
+    ) -> list[ItemT]:
+        """
+        Fetches the jobs concurrently and returns them in the order of `job_ids`.
+        Jobs that failed or did not arrive before the deadline are skipped.
+        """
+        if not job_ids:
+            return []
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_bounded(job_id: str) -> ItemT | None:
+            async with semaphore:
+                return await fetch(job_id)
+
+        tasks = [asyncio.ensure_future(fetch_bounded(job_id)) for job_id in job_ids]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
         job_list = []
-        for job_id in job_ids:
-            job_detail = self.get_detail(job_id, token)
-            if job_detail:
-                job_list.append(job_detail)
-        
+        for task in tasks:
+            if task.cancelled() or task.exception() is not None:
+                continue
+            if (job := task.result()) is not None:
+                job_list.append(job)
+
+        if len(job_list) < len(job_ids):
+            logger.warning("Fetched %d of %d TES tasks (%d timed out)", len(job_list), len(job_ids), len(pending))
+
         return job_list
 
-    def _get_model(self, job_id: str, token: AccessToken, list_view=False) -> JobModel | None:
-        request_url = f"{self.tes_api_url}/v1/tasks/{job_id}"
-        if not list_view:
-            request_url += "?view=FULL"
+    def _task_url(self, job_id: str, list_view: bool) -> str:
+        return f"{self.tes_api_url}/v1/tasks/{job_id}?view={'BASIC' if list_view else 'FULL'}"
+
+    def _model_class(self, list_view: bool) -> type[JobSummaryModel]:
+        # Only the fields JobRepository uses are parsed from the TES response
+        return JobSummaryModel if list_view else JobLogsModel
+
+    async def _get_model(
+        self, job_id: str, token: AccessToken, list_view=False, check_cache=True
+    ) -> JobSummaryModel | None:
+        request_url = self._task_url(job_id, list_view)
+
+        if self.cache is not None and check_cache:
+            job_model = await self.cache.get(request_url, self._model_class(list_view))
+            if job_model is not None:
+                return job_model
 
-        response = requests.get(request_url, headers={"Authorization": f"Bearer {token.value}"})
+        try:
+            response = await self.http_clients.get(request_url, headers={"Authorization": f"Bearer {token.value}"})
+        except httpx.HTTPError:
+            return None
 
         if response.status_code != 200:
             return None
 
         try:
-            job_model = JobModel.model_validate_json(response.text)
+            job_model = self._model_class(list_view).model_validate_json(response.content)
         except:
-            job_model = None
+            return None
+
+        if self.cache is not None:
+            await self.cache.set(request_url, job_model)
 
         return job_model
\ No newline at end of file
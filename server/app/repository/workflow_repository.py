@@ -1,90 +1,49 @@
 from uuid import UUID
 from app.common import WorkflowState
-from app.schemas import WorkflowListItem, WorkflowDetail
 from app.db.models import WorkflowModel
 from app.db import BaseDatabase
-from app.repository.job_repository import JobRepository
-from app.auth import AccessToken
 
 
 class WorkflowRepository:
-    def __init__(self, db: BaseDatabase, job_repository: JobRepository):
-        self.db = db
-        self.job_repository = job_repository
-
-    def get_list_item(self, workflow_id: UUID) -> WorkflowListItem | None:
-        workflow_model = self.db.get_one(WorkflowModel, {"id": workflow_id})
-
-        if not workflow_model:
-            return None
-        
-        return WorkflowListItem(
-            id=workflow_model.id,
-            created_at=workflow_model.created_at,
-            state=workflow_model.state,
-            total_jobs=workflow_model.total_jobs,
-            finished_jobs=workflow_model.finished_jobs,
-        )
-    
-    def get_detail(self, workflow_id: UUID, token: AccessToken) -> WorkflowDetail | None:
-        workflow_model = self.db.get_one(WorkflowModel, {"id": workflow_id})
-
-        if not workflow_model:
-            return None
-
-        return WorkflowDetail(
-            id=workflow_model.id,
-            created_at=workflow_model.created_at,
-            state=workflow_model.state,
-            jobs=self.job_repository.get_detail_list(workflow_model.job_ids, token),
-        )
-    
-    def get_owner(self, workflow_id: UUID) -> str | None:
-        workflow_model = self.db.get_one(WorkflowModel, {"id": workflow_id})
+    """
+    Synchronous repository used by the Celery task to record the progress of
+    the workflow it runs. The API reads and writes workflows through
+    `AsyncWorkflowRepository`.
+    """
 
-        if not workflow_model:
-            return None
-
-        return workflow_model.created_by
-    
-    def get_task_id(self, workflow_id: UUID) -> str | None:
-        workflow_model = self.db.get_one(WorkflowModel, {"id": workflow_id})
-
-        if not workflow_model:
-            return None
-
-        return workflow_model.task_id
-    
-    def get_list_by_user(self, username: str) -> list[WorkflowListItem]:
-        workflows = self.db.get_many(WorkflowModel, {"created_by": username})
+    def __init__(self, db: BaseDatabase):
+        self.db = db
 
-        res = []
-        for workflow in workflows:
-            workflow_res = WorkflowListItem(
-                id=workflow.id,
-                created_at=workflow.created_at,
-                state=workflow.state,
-                total_jobs=workflow.total_jobs,
-                finished_jobs=workflow.finished_jobs,
+    def update_progress(
+        self,
+        workflow_id: UUID,
+        state: WorkflowState | None = None,
+        finished_jobs: int | None = None,
+        total_jobs: int | None = None,
+        job_ids: list[str] | None = None,
+    ) -> bool:
+        """
+        Applies a progress update with a single write. A canceled workflow keeps
+        its state; the other fields are still updated.
+        """
+        fields: dict = {}
+        if finished_jobs is not None:
+            fields["finished_jobs"] = finished_jobs
+        if total_jobs is not None:
+            fields["total_jobs"] = total_jobs
+        push = {"job_ids": job_ids} if job_ids else None
+
+        if state is not None:
+            updated = self.db.update_fields(
+                WorkflowModel,
+                {"id": workflow_id, "state": {"$ne": WorkflowState.CANCELED.value}},
+                set={**fields, "state": WorkflowState(state).value},
+                push=push,
             )
+            if updated or not (fields or push):
+                return updated
 
-            res.append(workflow_res)
-        
-        return res
-
-    def cancel(self, workflow_id: UUID):
-        workflow = self.get(workflow_id)
-        if workflow is None:
-            return
-        
-        workflow.state = WorkflowState.CANCELED
-        self.db.update_one(WorkflowModel, {"id": workflow_id}, workflow)
-    
-    def get(self, workflow_id: UUID) -> WorkflowModel | None:
-        return self.db.get_one(WorkflowModel, {"id": workflow_id})
-    
-    def update(self, workflow: WorkflowModel):
-        self.db.update_one(WorkflowModel, {"id": workflow.id}, workflow)
+        if not (fields or push):
+            return False
 
-    def save(self, workflow: WorkflowModel):
-        self.db.insert_one(WorkflowModel, workflow)
\ No newline at end of file
+        return self.db.update_fields(WorkflowModel, {"id": workflow_id}, set=fields, push=push)
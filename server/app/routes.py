@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from uuid import UUID
 from .auth import AccessToken
 from .config import config
@@ -8,19 +10,20 @@ from .workflow_definition.manager import (
     get_workflow_definition_by_id,
     get_workflow_definition_list,
 )
-from .api_dependencies import get_authenticated_user, get_valid_access_token, get_workflow_repository
-from .schemas import WorkflowId, WorkflowDefinitionListItem, WorkflowDetail, WorkflowListItem, WorkflowRun
-from .repository import WorkflowRepository
+from .api_dependencies import get_authenticated_user, get_authorized_workflow_definition_ids, get_introspected_access_token, get_valid_access_token, get_workflow_repository
+from .common import WorkflowState
+from .schemas import JobLogs, WorkflowId, WorkflowDefinitionListItem, WorkflowDetail, WorkflowListPage, WorkflowRun
+from .repository import AsyncWorkflowRepository, InvalidCursor
 
 api_router = APIRouter(prefix="/api")
 
 @api_router.post("/run", response_model=WorkflowId, responses={400: {"description": "Invalid workflow definition ID"}, 401: {"description": "Unauthorized"}})
-async def run_workflow(workflow_run: WorkflowRun, token: AccessToken = Depends(get_valid_access_token), workflow_repository: WorkflowRepository = Depends(get_workflow_repository)):
+async def run_workflow(workflow_run: WorkflowRun, token: AccessToken = Depends(get_introspected_access_token), workflow_repository: AsyncWorkflowRepository = Depends(get_workflow_repository)):
     workflow_definition = get_workflow_definition_by_id(workflow_run.workflow_definition_id)
     if not workflow_definition:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Workflow definition not found")
 
-    if token.is_authorized_for_workflow(workflow_definition):
+    if not token.is_authorized_for_workflow(workflow_definition):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
     workflow_config = app_to_workflow_config()
@@ -32,7 +35,7 @@ async def run_workflow(workflow_run: WorkflowRun, token: AccessToken = Depends(g
     )
 
     username = token.userinfo.sub
-    workflow_id = workflow.run(
+    workflow_id = await workflow.run(
         workflow_config=workflow_config,
         workflow_definition_id=workflow_run.workflow_definition_id,
         input_dir=workflow_run.input_dir,
@@ -42,15 +45,24 @@ async def run_workflow(workflow_run: WorkflowRun, token: AccessToken = Depends(g
     return WorkflowId(id=workflow_id)
 
 
-@api_router.get("/workflow", response_model=list[WorkflowListItem])
-async def get_workflows(token: AccessToken = Depends(get_valid_access_token), workflow_repository: WorkflowRepository = Depends(get_workflow_repository)):
+@api_router.get("/workflow", response_model=WorkflowListPage, responses={400: {"description": "Invalid cursor"}})
+async def get_workflows(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    state: list[WorkflowState] | None = Query(None),
+    token: AccessToken = Depends(get_valid_access_token),
+    workflow_repository: AsyncWorkflowRepository = Depends(get_workflow_repository),
+):
     username = token.userinfo.sub
-    workflows = workflow_repository.get_list_by_user(username)
+    try:
+        workflows = await workflow_repository.get_list_by_user(username, limit, cursor, state)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
     return workflows
 
 
 @api_router.delete("/workflow/{workflow_id}", response_model=WorkflowId, responses={400: {"description": "Invalid workflow ID"}, 404: {"description": "Workflow not found"}})
-async def cancel_workflow(workflow_id: UUID, token: AccessToken = Depends(get_valid_access_token), workflow_repository: WorkflowRepository = Depends(get_workflow_repository)):
+async def cancel_workflow(workflow_id: UUID, token: AccessToken = Depends(get_introspected_access_token), workflow_repository: AsyncWorkflowRepository = Depends(get_workflow_repository)):
     workflow = Workflow(
         workflow_repository=workflow_repository,
         log_dir=config.app.log_dir,
@@ -60,28 +72,52 @@ async def cancel_workflow(workflow_id: UUID, token: AccessToken = Depends(get_va
     )
     
     username = token.userinfo.sub
-    if not workflow.exists() or not workflow.is_owned_by_user(username):
+    if not await workflow.exists() or not await workflow.is_owned_by_user(username):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
 
-    workflow.cancel()
+    await workflow.cancel()
 
     return WorkflowId(id=workflow_id)
 
 @api_router.get("/workflow/{workflow_id}", response_model=WorkflowDetail, responses={400: {"description": "Invalid workflow ID"}, 404: {"description": "Workflow not found"}})
-async def worflow_detail(workflow_id: UUID, token: AccessToken = Depends(get_valid_access_token), workflow_repository: WorkflowRepository = Depends(get_workflow_repository)):
-    workflow_owner = workflow_repository.get_owner(workflow_id)
+async def worflow_detail(workflow_id: UUID, token: AccessToken = Depends(get_valid_access_token), workflow_repository: AsyncWorkflowRepository = Depends(get_workflow_repository)):
+    workflow_owner = await workflow_repository.get_owner(workflow_id)
     if workflow_owner != token.userinfo.sub:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
 
-    workflow_detail = workflow_repository.get_detail(workflow_id, token)
+    workflow_detail = await workflow_repository.get_detail(workflow_id, token)
     if workflow_detail is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
 
     return workflow_detail
 
+@api_router.get("/workflow/{workflow_id}/job/{job_id}/logs", response_model=JobLogs, responses={404: {"description": "Job not found"}, 422: {"description": "Tail given together with offset or length"}})
+async def job_logs(
+    workflow_id: UUID,
+    job_id: str,
+    stream: Literal["stdout", "stderr"] = "stdout",
+    tail: int | None = Query(None, ge=1, le=100000),
+    offset: int | None = Query(None, ge=0),
+    length: int | None = Query(None, ge=1),
+    token: AccessToken = Depends(get_valid_access_token),
+    workflow_repository: AsyncWorkflowRepository = Depends(get_workflow_repository),
+):
+    if tail is not None and (offset is not None or length is not None):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Tail cannot be combined with offset or length")
+
+    workflow_owner = await workflow_repository.get_owner(workflow_id)
+    if workflow_owner != token.userinfo.sub:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    logs = await workflow_repository.get_job_logs(workflow_id, job_id, token, stream, tail, offset or 0, length)
+    if logs is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return logs
+
 
-@api_router.get("/workflow_definition", response_model=list[WorkflowDefinitionListItem])
-def workflow_definition():
-    workflow_definitions = get_workflow_definition_list()
+@api_router.get("/workflow_definition", response_model=list[WorkflowDefinitionListItem], responses={401: {"description": "Unauthorized"}})
+def workflow_definition(authorized_ids: set[UUID] | None = Depends(get_authorized_workflow_definition_ids)):
+    workflow_definitions = get_workflow_definition_list(authorized_ids)
 
     return workflow_definitions
@@ -1,5 +1,6 @@
 from uuid import UUID
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel
 from app.common import WorkflowState
 
@@ -13,17 +14,23 @@ class WorkflowListItem(BaseModel):
     finished_jobs: int
     total_jobs: int
 
-class JobDetail(BaseModel):
-    id: str
-    created_at: datetime
-    state: str
-    logs: str
+class WorkflowListPage(BaseModel):
+    items: list[WorkflowListItem]
+    next_cursor: str | None = None
 
 class JobListItem(BaseModel):
     id: str
     created_at: datetime
     state: str
 
+class JobLogs(BaseModel):
+    id: str
+    stream: Literal["stdout", "stderr"]
+    content: str
+    # Byte offset of `content` in the log and the size of the whole log
+    offset: int
+    size: int
+
 class WorkflowDetail(BaseModel):
     id: UUID
     created_at: datetime
@@ -31,7 +38,7 @@ class WorkflowDetail(BaseModel):
     #workflow_definition_id: UUID
     #input_dir: str
     #output_dir: str
-    jobs: list[JobDetail]
+    jobs: list[JobListItem]
 
 class WorkflowDefinitionListItem(BaseModel):
     id: UUID
@@ -0,0 +1,138 @@
+import time
+from uuid import UUID
+
+from .common import WorkflowState
+from .repository import WorkflowRepository
+
+
+class ProgressSink:
+    """Coalesces the progress updates of a running workflow into few database writes.
+
+    Updates are merged in memory and written together at most once every
+    `flush_interval` seconds. A state change is written immediately, so the
+    UI sees a workflow start or finish without delay. `flush` must be called
+    when the task ends to write whatever is still pending.
+    """
+
+    def __init__(self, workflow_repository: WorkflowRepository, workflow_id: UUID, flush_interval: float):
+        self.workflow_repository = workflow_repository
+        self.workflow_id = workflow_id
+        self.flush_interval = flush_interval
+
+        self._state: WorkflowState | None = None
+        self._finished_jobs: int | None = None
+        self._total_jobs: int | None = None
+        self._job_ids: list[str] = []
+
+        self._written_state: WorkflowState | None = None
+        self._last_flush = time.monotonic()
+
+    @property
+    def has_pending(self) -> bool:
+        return (
+            self._state is not None
+            or self._finished_jobs is not None
+            or self._total_jobs is not None
+            or bool(self._job_ids)
+        )
+
+    def update(
+        self,
+        state: WorkflowState | None = None,
+        finished_jobs: int | None = None,
+        total_jobs: int | None = None,
+        job_id: str | None = None,
+    ):
+        if state is not None:
+            self._state = state
+        if finished_jobs is not None:
+            self._finished_jobs = finished_jobs
+        if total_jobs is not None:
+            self._total_jobs = total_jobs
+        if job_id is not None:
+            self._job_ids.append(job_id)
+
+        if state is not None and state != self._written_state:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self.has_pending:
+            return
+
+        self.workflow_repository.update_progress(
+            self.workflow_id,
+            state=self._state,
+            finished_jobs=self._finished_jobs,
+            total_jobs=self._total_jobs,
+            job_ids=self._job_ids,
+        )
+
+        if self._state is not None:
+            self._written_state = self._state
+        self._state = self._finished_jobs = self._total_jobs = None
+        self._job_ids = []
+
+
+class RunLogSink:
+    """Appends the output of a workflow run to its log file.
+
+    The file stays open for the whole run. Lines are buffered and written once
+    `buffer_size` characters are pending or `flush_interval` seconds passed
+    since the last write. Use it as a context manager, so the buffer is
+    written when the run ends, also on abort or error.
+    """
+
+    def __init__(self, log_file_path: str, flush_interval: float, buffer_size: int = 64 * 1024):
+        self.log_file_path = log_file_path
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+
+        self._file = open(log_file_path, "a")
+        self._buffer: list[str] = []
+        self._buffered_size = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, line: str):
+        self._buffer.append(line + "\n")
+        self._buffered_size += len(line) + 1
+
+        if self._buffered_size >= self.buffer_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+        self._buffered_size = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        try:
+            self.flush()
+        finally:
+            self._file.close()
@@ -1,72 +1,192 @@
+import codecs
+import contextlib
+import io
 import logging
 import os
 import re
-import select
+import selectors
 import shutil
 import signal
+import time
 from typing import Dict, Optional
 import uuid
 from subprocess import PIPE, STDOUT, CalledProcessError, CompletedProcess, Popen
 
+import redis
 from celery import shared_task
 from celery.contrib.abortable import AbortableTask
+from celery.signals import worker_process_init, worker_process_shutdown
 
+from .cancellation import CancellationListener
 from .common import WorkflowState
+from .config import config
+from .sinks import ProgressSink, RunLogSink
 from .utils import pull_workflow_definitions
 from .workflow_config import WorkflowConfig
-from .api_dependencies import get_workflow_repository
+from .api_dependencies import close_mongo_client, create_workflow_repository, get_mongo_client
+
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_MAX_CHUNKS = 16
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    if config.database.backend == "mongo":
+        get_mongo_client()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    close_mongo_client()
 
 
 def stream_command(
     args,
     *,
     stdout_handler=logging.info,
+    idle_handler=None,
     abort_condition=None,
     abort_signal=signal.SIGINT,
     on_abort=None,
+    abort_notifier=None,
+    abort_check_interval=1.0,
+    idle_interval=1.0,
     check=False,
     text=True,
     **kwargs,
 ):
-    """Mimic subprocess.run, while processing the command output in real time."""
-    with Popen(args, text=text, stdout=PIPE, stderr=STDOUT, **kwargs) as process:
+    """Mimic subprocess.run, while processing the command output in real time.
+
+    The output is read in chunks of whatever is available, so a burst of lines
+    costs a single wakeup. `abort_condition` is checked every
+    `abort_check_interval` seconds and `idle_handler` is called when there was
+    no output for `idle_interval` seconds. The command is also aborted as soon
+    as `abort_notifier`, an object with a `fileno`, becomes readable.
+    """
+    with Popen(args, stdout=PIPE, stderr=STDOUT, **kwargs) as process:
+        assert process.stdout is not None
+
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+
+        # Universal newlines like a text mode Popen: "\r\n" and "\r" end lines too
+        decoder = (
+            io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+            if text else None
+        )
+        newline = "\n" if text else b"\n"
+        pending = "" if text else b""
+
         aborted = False
+        next_abort_check = time.monotonic()
+        next_idle = time.monotonic() + idle_interval
+
+        def abort():
+            nonlocal aborted
+            os.kill(process.pid, abort_signal)
+            on_abort(process) if on_abort else None
+            aborted = True
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            if abort_notifier is not None:
+                selector.register(abort_notifier, selectors.EVENT_READ)
+
+            while True:
+                if abort_condition and not aborted and time.monotonic() >= next_abort_check:
+                    if abort_condition():
+                        abort()
+                    next_abort_check = time.monotonic() + abort_check_interval
+
+                wakeup = next_idle
+                if abort_condition and not aborted:
+                    wakeup = min(wakeup, next_abort_check)
+
+                events = selector.select(max(wakeup - time.monotonic(), 0))
+                if not events:
+                    if time.monotonic() >= next_idle:
+                        idle_handler() if idle_handler else None
+                        next_idle = time.monotonic() + idle_interval
+                    continue
+
+                if any(key.fileobj is abort_notifier for key, _ in events):
+                    selector.unregister(abort_notifier)
+                    if not aborted:
+                        abort()
+                    if len(events) == 1:
+                        continue
+
+                next_idle = time.monotonic() + idle_interval
+
+                # Bounded, so a command that never stops writing still lets the abort checks run
+                chunks = []
+                eof = False
+                while len(chunks) < STREAM_MAX_CHUNKS:
+                    try:
+                        chunk = os.read(fd, STREAM_CHUNK_SIZE)
+                    except BlockingIOError:
+                        break
+                    if not chunk:
+                        eof = True
+                        break
+                    chunks.append(chunk)
+
+                data = b"".join(chunks)
+                if decoder is not None:
+                    data = decoder.decode(data, final=eof)
+
+                lines = (pending + data).split(newline)
+                pending = lines.pop()
+                for line in lines:
+                    stdout_handler(line)
+
+                if eof:
+                    if pending:
+                        stdout_handler(pending)
+                    break
 
-        while True:
-            if abort_condition and not aborted:
-                if abort_condition():
-                    os.kill(process.pid, abort_signal)
-                    on_abort(process) if on_abort else None
-                    aborted = True
+    retcode = process.wait()
 
-            reads, _, _ = select.select([process.stdout], [], [], 1)
-            if not reads:
-                continue
+    if check and retcode != 0:
+        raise CalledProcessError(retcode, process.args)
+    return CompletedProcess(process.args, retcode)
 
-            line = process.stdout.readline() if process.stdout is not None else None
 
-            if not line:
-                break
+def start_cancellation_listener(workflow_id: str) -> CancellationListener | None:
+    if not config.celery.cancel_redis_url:
+        return None
 
-            stdout_handler(line[:-1])
+    try:
+        listener = CancellationListener(config.celery.cancel_redis_url, workflow_id)
+    except Exception:
+        logger.exception("Failed to create the cancellation listener, relying on polling")
+        return None
 
-    retcode = process.wait()
+    try:
+        listener.start()
+    except redis.RedisError:
+        logger.exception("Failed to subscribe to cancellations, relying on polling")
+        listener.close()
+        return None
 
-    if check and retcode != 0:
-        raise CalledProcessError(retcode, process.args)
-    return CompletedProcess(process.args, retcode)
+    return listener
+
+
+PROGRESS_REGEX = re.compile(r"^(\d*) of (\d*) steps .* done$")
+TASK_SUBMITTED_PREFIX = "[TES] Task submitted: "
 
 
-def log_handler(workflow_repository, log_file_path, line, workflow_id):
-    with open(log_file_path, "a") as f:
-        f.write(line + "\n")
+def log_handler(progress_sink: ProgressSink, run_log_sink: RunLogSink, line):
+    run_log_sink.write(line)
 
-    progress_regex = re.compile(r"^(\d*) of (\d*) steps .* done$")
-    line_match = progress_regex.match(line)
+    line_match = PROGRESS_REGEX.match(line)
 
     job_id = state = finished_jobs = total_jobs = None
 
-    if line.startswith("[TES] Task submitted: "):
+    if line.startswith(TASK_SUBMITTED_PREFIX):
         job_id = line.split(" ")[-1]
         state = WorkflowState.RUNNING
     elif line.startswith("total"):
@@ -82,23 +202,16 @@ def log_handler(workflow_repository, log_file_path, line, workflow_id):
         else:
             state = WorkflowState.RUNNING
     else:
+        # Steady output without progress must not hold back pending updates
+        progress_sink.flush_if_due()
         return
 
-    
-    workflow = workflow_repository.get(uuid.UUID(workflow_id))
-    if not workflow:
-        return
-
-    if finished_jobs:
-        workflow.finished_jobs = finished_jobs
-    if total_jobs:
-        workflow.total_jobs = total_jobs
-    if state:
-        workflow.state = state
-    if job_id:
-        workflow.job_ids.append(job_id)
-
-    workflow_repository.update(workflow)
+    progress_sink.update(
+        state=state,
+        finished_jobs=finished_jobs,
+        total_jobs=total_jobs,
+        job_id=job_id,
+    )
 
 @shared_task(base=AbortableTask, bind=True)
 def run_workflow(
@@ -114,7 +227,7 @@ def run_workflow(
     token: str,
     input_mapping: Optional[Dict[str, str]] = None,
 ):
-    workflow_repository = get_workflow_repository()
+    workflow_repository = create_workflow_repository()
 
     pull_workflow_definitions(
         workflow_config.workflow_definition_dir,
@@ -180,36 +293,57 @@ def run_workflow(
         )
         command_args.extend(["--input-passthrough-mapping", input_mapping_str])
 
-    res = stream_command(
-        command_args,
-        cwd=current_workflow_dir,
-        env={
-            **os.environ,
-            "ACCESS_TOKEN": token,
-            "WORKFLOW_ID": workflow_id,
-            "RESULT_BUCKET": result_bucket,
-            "INPUT_DIR": input_dir,
-            "OUTPUT_DIR": output_dir,
-            "USER_ID": username.replace("@", "_"),
-            "INBOX_HOST": workflow_config.inbox_host,
-            "DOWNLOAD_HOST": workflow_config.download_host,
-            "TMP_DIR": workflow_config.tmp_dir,
-            "CLIENT_ID": workflow_config.oidc_client_id,
-            "CLIENT_SECRET": workflow_config.oidc_client_secret,
-            "OIDC_URL": workflow_config.oidc_url,
-            "AUDIENCE": workflow_config.oidc_audience,
-        },
-        stdout_handler=lambda line: log_handler(workflow_repository, log_file_path, line, workflow_id),
-        abort_condition=self.is_aborted,
-    )
+    # Everything opened for the run is closed in reverse order, also when
+    # creating one of the later resources fails
+    with contextlib.ExitStack() as resources:
+        progress_sink = ProgressSink(
+            workflow_repository,
+            uuid.UUID(workflow_id),
+            flush_interval=config.celery.progress_flush_interval_ms / 1000,
+        )
+        resources.callback(progress_sink.flush)
+
+        run_log_sink = resources.enter_context(
+            RunLogSink(log_file_path, flush_interval=config.celery.log_flush_interval_ms / 1000)
+        )
+
+        def flush_if_due():
+            run_log_sink.flush_if_due()
+            progress_sink.flush_if_due()
+
+        cancellation_listener = start_cancellation_listener(workflow_id)
+        if cancellation_listener is not None:
+            resources.callback(cancellation_listener.close)
+
+        res = stream_command(
+            command_args,
+            cwd=current_workflow_dir,
+            env={
+                **os.environ,
+                "ACCESS_TOKEN": token,
+                "WORKFLOW_ID": workflow_id,
+                "RESULT_BUCKET": result_bucket,
+                "INPUT_DIR": input_dir,
+                "OUTPUT_DIR": output_dir,
+                "USER_ID": username.replace("@", "_"),
+                "INBOX_HOST": workflow_config.inbox_host,
+                "DOWNLOAD_HOST": workflow_config.download_host,
+                "TMP_DIR": workflow_config.tmp_dir,
+                "CLIENT_ID": workflow_config.oidc_client_id,
+                "CLIENT_SECRET": workflow_config.oidc_client_secret,
+                "OIDC_URL": workflow_config.oidc_url,
+                "AUDIENCE": workflow_config.oidc_audience,
+            },
+            stdout_handler=lambda line: log_handler(progress_sink, run_log_sink, line),
+            idle_handler=flush_if_due,
+            abort_condition=self.is_aborted,
+            abort_notifier=cancellation_listener,
+            abort_check_interval=config.celery.abort_poll_interval_ms / 1000,
+        )
 
     shutil.rmtree(current_workflow_dir)
 
     if res.returncode != 0 and not self.is_aborted():
-        workflow = workflow_repository.get(uuid.UUID(workflow_id))
-        if not workflow:
-            return
-        workflow.state = WorkflowState.FAILED
-        workflow_repository.update(workflow)
+        workflow_repository.update_progress(uuid.UUID(workflow_id), state=WorkflowState.FAILED)
 
     return res.returncode
@@ -6,10 +6,11 @@ from pathlib import Path
 from celery.contrib.abortable import AbortableAsyncResult
 
 from .auth import AccessToken
+from .cancellation import publish_cancellation
 from .db.models import WorkflowModel
 from .tasks import run_workflow
 from .workflow_definition.manager import get_workflow_definition_by_id
-from .repository import WorkflowRepository
+from .repository import AsyncWorkflowRepository
 from .config import config
 from .workflow_config import WorkflowConfig
 
@@ -24,7 +25,7 @@ class WorkflowMultipleRuns(Exception):
 class Workflow:
     def __init__(
         self,
-        workflow_repository: WorkflowRepository,
+        workflow_repository: AsyncWorkflowRepository,
         log_dir: str,
         tes_url: str,
         token: AccessToken,
@@ -36,20 +37,21 @@ class Workflow:
         self.tes_url = tes_url
         self.token = token
 
-        self.was_run = self.exists()
+        # Resolved by `exists`, which needs to query the database
+        self.was_run = False
 
     @staticmethod
     def ensure_was_run(f):
         @wraps(f)
-        def decorated(self, *args, **kwargs):
-            if not self.was_run:
+        async def decorated(self, *args, **kwargs):
+            if not self.was_run and not await self.exists():
                 raise WorkflowWasNotRun
 
-            return f(self, *args, **kwargs)
+            return await f(self, *args, **kwargs)
 
         return decorated
 
-    def run(
+    async def run(
         self,
         workflow_config: WorkflowConfig,
         workflow_definition_id: uuid.UUID,
@@ -57,7 +59,7 @@ class Workflow:
         output_dir: str,
         username: str,
     ):
-        if self.was_run:
+        if self.was_run or await self.exists():
             raise WorkflowMultipleRuns
 
         self.id = uuid.uuid4()
@@ -72,11 +74,8 @@ class Workflow:
 
         workflow_definition_metadata = get_workflow_definition_by_id(workflow_definition_id)
         
-        for tes_datasets in config.tes_data:
-            if input_dir in tes_datasets.datasets:
-                workflow_config.auth_tes_url = tes_datasets.tes_url
-                break
-        
+        workflow_config.auth_tes_url = config.get_tes_url(input_dir)
+
         task_state = run_workflow.delay(
             workflow_config=workflow_config,
             workflow_id=str(self.id),
@@ -94,30 +93,35 @@ class Workflow:
             _id=self.id,
             task_id=task_state.id,
             created_by=username,
+            tes_url=workflow_config.auth_tes_url,
         )
 
-        self.workflow_repository.save(workflow)
+        await self.workflow_repository.save(workflow)
 
         return self.id
 
-    def exists(self):
+    async def exists(self):
         if not self.id:
             return False
 
-        return self.workflow_repository.get_list_item(self.id) is not None
+        self.was_run = await self.workflow_repository.get(self.id) is not None
+        return self.was_run
 
     @ensure_was_run
-    def cancel(self):
-        self.workflow_repository.cancel(self.id)
-        task_id = self.workflow_repository.get_task_id(self.id)
+    async def cancel(self):
+        await self.workflow_repository.cancel(self.id)
+        task_id = await self.workflow_repository.get_task_id(self.id)
         result = AbortableAsyncResult(task_id)
         result.abort()
 
+        if config.celery.cancel_redis_url:
+            await publish_cancellation(config.celery.cancel_redis_url, self.id)
+
     @ensure_was_run
-    def is_owned_by_user(self, username):
-        workflow_owner = self.workflow_repository.get_owner(self.id)
+    async def is_owned_by_user(self, username):
+        workflow_owner = await self.workflow_repository.get_owner(self.id)
         return workflow_owner == username
 
     @ensure_was_run
-    def get_detail(self):
-        return self.workflow_repository.get_detail(self.id, self.token)
+    async def get_detail(self):
+        return await self.workflow_repository.get_detail(self.id, self.token)
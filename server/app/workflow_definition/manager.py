@@ -1,7 +1,11 @@
 import json
 import os
+import threading
 from uuid import UUID
 
+from git import Repo
+
+from app.cache import TTLCache
 from app.wrappers import with_updated_workflow_definitions
 
 from . import WorkflowDefinitionMetadata
@@ -15,6 +19,72 @@ def get_workflow_definition(dir: str) -> WorkflowDefinitionMetadata:
         return WorkflowDefinitionMetadata.model_validate(metadata_dict)
 
 
+class WorkflowDefinitionCatalog:
+    """Workflow definitions of one revision of the definition repository.
+
+    Entitlement patterns are compiled once per definition, and the set of
+    definitions an entitlement list is authorized for is computed in a single
+    pass and cached for the lifetime of the catalog.
+    """
+
+    AUTHORIZATION_CACHE_SIZE = 1024
+
+    def __init__(self, revision: str, definitions: list[WorkflowDefinitionMetadata]):
+        self.revision = revision
+        self.definitions = {d.id: d for d in definitions}
+
+        self._authorization_cache: TTLCache[frozenset[str], frozenset[UUID]] = TTLCache(
+            max_size=self.AUTHORIZATION_CACHE_SIZE, ttl=float("inf")
+        )
+
+        # Compile the entitlement matchers up front instead of on the first request
+        for definition in definitions:
+            definition.entitlement_matcher
+
+    def __iter__(self):
+        return iter(self.definitions.values())
+
+    def get(self, workflow_definition_id: UUID) -> WorkflowDefinitionMetadata | None:
+        return self.definitions.get(workflow_definition_id)
+
+    def get_authorized_ids(self, entitlements: list[str]) -> frozenset[UUID]:
+        entitlement_set = frozenset(entitlements)
+
+        authorized_ids = self._authorization_cache.get(entitlement_set)
+        if authorized_ids is None:
+            entitlement_list = list(entitlement_set)
+            authorized_ids = frozenset(
+                d.id for d in self.definitions.values() if d.is_entitlement_satisfied(entitlement_list)
+            )
+            self._authorization_cache.set(entitlement_set, authorized_ids)
+
+        return authorized_ids
+
+
+_catalog: WorkflowDefinitionCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_workflow_definition_catalog() -> WorkflowDefinitionCatalog:
+    """Returns the catalog, reloading it only when the repository revision changed."""
+    global _catalog
+
+    revision = get_workflow_definition_revision()
+    catalog = _catalog
+    if catalog is not None and catalog.revision == revision:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.revision != revision:
+            _catalog = WorkflowDefinitionCatalog(revision, get_workflow_definitions())
+
+        return _catalog
+
+
+def get_workflow_definition_revision() -> str:
+    return Repo(config.app.workflow_definition_dir).head.commit.hexsha
+
+
 def get_workflow_definitions() -> list[WorkflowDefinitionMetadata]:
     workflow_definition_dirs = get_workflow_definition_dirs()
     return [get_workflow_definition(d) for d in workflow_definition_dirs]
@@ -24,11 +94,7 @@ def get_workflow_definitions() -> list[WorkflowDefinitionMetadata]:
 def get_workflow_definition_by_id(
     workflow_definition_id: UUID,
 ) -> WorkflowDefinitionMetadata | None:
-    for workflow_definition in get_workflow_definitions():
-        if workflow_definition.id == workflow_definition_id:
-            return workflow_definition
-    
-    return None
+    return get_workflow_definition_catalog().get(workflow_definition_id)
 
 
 def get_workflow_definition_dirs() -> list[str]:
@@ -45,10 +111,15 @@ def get_workflow_definition_dirs() -> list[str]:
 
 
 @with_updated_workflow_definitions
-def get_workflow_definition_list() -> list[WorkflowDefinitionListItem]:
+def get_workflow_definition_list(
+    authorized_ids: set[UUID] | frozenset[UUID] | None = None,
+) -> list[WorkflowDefinitionListItem]:
     res = []
 
-    for workflow_definition in get_workflow_definitions():
+    for workflow_definition in get_workflow_definition_catalog():
+        if authorized_ids is not None and workflow_definition.id not in authorized_ids:
+            continue
+
         with open(os.path.join(str(workflow_definition.dir), "Snakefile")) as f:
             definition = f.read()
 
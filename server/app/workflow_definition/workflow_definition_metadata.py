@@ -1,4 +1,5 @@
 import re
+from functools import cached_property
 from uuid import UUID
 from typing import Dict, Optional, TypedDict
 from pydantic import BaseModel
@@ -30,15 +31,24 @@ class WorkflowDefinitionMetadata(BaseModel):
 
         return patterns
 
+    @cached_property
+    def entitlement_matcher(self) -> re.Pattern | None:
+        """All allowed entitlement patterns compiled into a single regex."""
+        patterns = self.allowed_entitlement_patterns
+        if not patterns:
+            return None
+
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
     def __repr__(self):
         return f"WorkflowDefinition({self.dir}, {self.id}, {self.name}, {self.allowed_entitlement_patterns})"
 
     def is_entitlement_satisfied(self, entitlements: list[str]) -> bool:
-        for pattern in self.allowed_entitlement_patterns:
-            if any(re.match(pattern, e) for e in entitlements):
-                return True
+        matcher = self.entitlement_matcher
+        if matcher is None:
+            return False
 
-        return False
+        return any(matcher.match(e) for e in entitlements)
     
     def get_input_mapping(self, params: Dict[str, str]) -> Dict[str, str]:
         if not self.input_mapping:
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+"""Measures how many lines of Snakemake output the Celery task ingests per second.
+
+The output is fed through `log_handler`, which writes the run log and
+parses the progress, once with the previous handler that opened the log
+file and compiled the progress regex for every line, and once with the
+buffered RunLogSink. Progress updates go to a sink that discards them, so
+only the ingestion itself is measured. Run from the `server` directory.
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from app.sinks import RunLogSink
+from app.tasks import log_handler
+
+
+class DiscardingProgressSink:
+    def update(self, **kwargs):
+        pass
+
+
+def create_output(lines: int) -> list[str]:
+    output = []
+    for i in range(lines):
+        if i % 50 == 0:
+            output.append(f"[TES] Task submitted: task-{i}")
+        elif i % 50 == 1:
+            output.append(f"{i} of {lines} steps ({i * 100 // lines}%) done")
+        else:
+            output.append(f"[Mon Jan  1 00:00:00 2024] rule align: input: sample{i}.fastq, output: sample{i}.bam")
+    return output
+
+
+def unbuffered_log_handler(progress_sink, log_file_path, line):
+    """The handler before RunLogSink, kept for comparison."""
+    with open(log_file_path, "a") as f:
+        f.write(line + "\n")
+
+    progress_regex = re.compile(r"^(\d*) of (\d*) steps .* done$")
+    line_match = progress_regex.match(line)
+
+    if line.startswith("[TES] Task submitted: "):
+        progress_sink.update(job_id=line.split(" ")[-1])
+    elif line_match:
+        progress_sink.update(finished_jobs=int(line_match.group(1)), total_jobs=int(line_match.group(2)))
+
+
+def ingest_unbuffered(output: list[str], log_file_path: str):
+    progress_sink = DiscardingProgressSink()
+    for line in output:
+        unbuffered_log_handler(progress_sink, log_file_path, line)
+
+
+def ingest_buffered(output: list[str], log_file_path: str):
+    progress_sink = DiscardingProgressSink()
+    with RunLogSink(log_file_path, flush_interval=1.0) as run_log_sink:
+        for line in output:
+            log_handler(progress_sink, run_log_sink, line)  # type: ignore
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    output = create_output(args.lines)
+
+    for name, ingest in [("per-line open", ingest_unbuffered), ("RunLogSink", ingest_buffered)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file_path = os.path.join(tmp_dir, "run.log")
+
+            started_at = time.perf_counter()
+            ingest(output, log_file_path)
+            elapsed = time.perf_counter() - started_at
+
+        print(f"{name:<15} {args.lines / elapsed:>12,.0f} lines/s")
@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+"""Compares parsing TES task payloads into the full JobModel and into the
+projections read by JobRepository.
+
+Synthetic FULL-view tasks are generated with growing logs and numbers of
+executors and inputs; for each the parse time and the growth of the peak
+resident set size during parsing are reported. The memory is measured in a
+forked process through `getrusage`, so the allocations made by pydantic-core
+are included, which tracemalloc cannot see. Linux only. Run from the
+`server` directory.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+
+from app.common.models import JobLogsModel, JobModel, JobSummaryModel
+
+
+def create_task(log_size: int, executors: int) -> str:
+    log_line = "x" * 79 + "\n"
+    log = log_line * (log_size // len(log_line))
+
+    return json.dumps({
+        "id": "task",
+        "state": "COMPLETE",
+        "name": "snakejob",
+        "description": "",
+        "creation_time": "2024-01-01T00:00:00Z",
+        "executors": [
+            {
+                "command": ["sh", "-c", "run"], "env": {f"VAR{i}": "value" for i in range(20)},
+                "ignore_error": False, "image": "image", "stdin": "", "workdir": "/tmp",
+            }
+            for _ in range(executors)
+        ],
+        "inputs": [
+            {
+                "description": "", "name": f"input{i}", "path": f"/data/input{i}",
+                "streamable": False, "type": "FILE", "url": f"s3://bucket/input{i}",
+            }
+            for i in range(executors * 10)
+        ],
+        "logs": [{
+            "start_time": "2024-01-01T00:00:00Z", "end_time": "", "metadata": {},
+            "outputs": [f"/data/output{i}" for i in range(executors * 10)],
+            "system_logs": ["started"],
+            "logs": [
+                {"start_time": "2024-01-01T00:00:00Z", "end_time": "", "exit_code": 0, "stdout": log, "stderr": log}
+                for _ in range(executors)
+            ],
+        }],
+    })
+
+
+def get_peak_rss() -> int:
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def parse_in_child(parse, payload: str, connection):
+    # A forked process starts with its peak RSS reset to the memory it shares with the parent
+    baseline = get_peak_rss()
+    result = parse(payload)
+    connection.send(get_peak_rss() - baseline)
+    del result
+
+
+def measure_peak_rss(parse, payload: str) -> int:
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=parse_in_child, args=(parse, payload, sender))
+    process.start()
+    peak = receiver.recv()
+    process.join()
+    return peak
+
+
+def measure(parse, payload: str, repeat: int) -> tuple[float, int]:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        parse(payload)
+    elapsed = (time.perf_counter() - started_at) / repeat
+
+    return elapsed, measure_peak_rss(parse, payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    parsers = {
+        "JobModel": JobModel.model_validate_json,
+        "JobLogsModel": JobLogsModel.model_validate_json,
+        "JobSummaryModel": JobSummaryModel.model_validate_json,
+    }
+
+    print(f"{'log size':>10} {'executors':>9} {'payload':>10}  {'parser':<16} {'time':>10} {'peak RSS':>12}")
+    for log_size in [1_000, 100_000, 10_000_000]:
+        for executors in [1, 20]:
+            payload = create_task(log_size, executors)
+
+            for name, parse in parsers.items():
+                elapsed, peak = measure(parse, payload, args.repeat)
+                print(
+                    f"{log_size:>10} {executors:>9} {len(payload):>10}  {name:<16} "
+                    f"{elapsed * 1000:>8.2f}ms {peak / 1024 ** 2:>10.1f}MB"
+                )
@@ -0,0 +1,29 @@
+#! /usr/bin/env python
+"""Reports database indexes declared by the models but missing in the database.
+
+Run with --create to create the missing indexes.
+"""
+import argparse
+import sys
+
+from app.api_dependencies import get_database
+from app.db.models import all_models
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--create", action="store_true", help="create the missing indexes")
+    args = parser.parse_args()
+
+    db = get_database()
+
+    missing = False
+    for model in all_models:
+        for index in db.get_missing_indexes(model):
+            missing = True
+            print(f"{model._collection_name}: missing index {index.keys}")
+
+        if args.create:
+            db.ensure_indexes(model)
+
+    sys.exit(1 if missing and not args.create else 0)
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import logging
+import time
+from uuid import uuid4
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api_dependencies
+from app.api_dependencies import is_token_valid
+from app.auth import AccessToken, AuthClient, SigningKeyCache
+from app.config import config
+from app.http_client import HttpClientPool
+from app.routes import api_router
+
+ISSUER = "http://idp"
+AUDIENCE = "api"
+JWKS_URL = "http://idp/jwks"
+
+
+def create_signing_key(kid: str) -> tuple[rsa.RSAPrivateKey, dict]:
+    """Returns an RSA private key and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def issue_token(private_key: rsa.RSAPrivateKey, kid: str = "key-1", **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "sub": "alice", "iss": ISSUER, "aud": AUDIENCE, "exp": now + 300, "iat": now, "jti": str(uuid4()),
+        "acr": "", "scope": "openid", "auth_time": now, "client_id": "client",
+    }
+    payload.update(claims)
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class MockIdP:
+    """OIDC provider serving the discovery document, a JWKS, which fails while
+    `jwks_down` is set, and an introspection endpoint answering `active`."""
+
+    def __init__(self, jwks: list[dict]):
+        self.jwks = jwks
+        self.jwks_down = False
+        self.active = True
+        self.requests: list[str] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if request.url.path == "/.well-known/openid-configuration":
+            return httpx.Response(200, json={
+                "issuer": ISSUER,
+                "authorization_endpoint": f"{ISSUER}/authorize",
+                "token_endpoint": f"{ISSUER}/token",
+                "userinfo_endpoint": f"{ISSUER}/userinfo",
+                "jwks_uri": JWKS_URL,
+                "introspection_endpoint": f"{ISSUER}/introspect",
+            })
+        if request.url.path == "/introspect":
+            return httpx.Response(200, json={"active": self.active})
+        if request.url.path == "/jwks":
+            if self.jwks_down:
+                raise httpx.ConnectError("connection refused", request=request)
+            # Gives concurrent requests the chance to pile up behind the download
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"keys": self.jwks})
+
+        return httpx.Response(404)
+
+    def create_http_clients(self) -> HttpClientPool:
+        http_clients = HttpClientPool()
+        http_clients._clients["http://idp"] = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return http_clients
+
+    def create_auth_client(self) -> AuthClient:
+        return AuthClient(ISSUER, "client", "secret", self.create_http_clients(), audience=AUDIENCE)
+
+
+# Generating RSA keys is slow, the tests share one
+PRIVATE_KEY, PUBLIC_JWK = create_signing_key("key-1")
+
+
+@pytest.fixture
+def private_key() -> rsa.RSAPrivateKey:
+    return PRIVATE_KEY
+
+
+@pytest.fixture
+def idp() -> MockIdP:
+    return MockIdP([PUBLIC_JWK])
+
+
+def validate(idp: MockIdP, token: str, strategy: str) -> bool:
+    async def run() -> bool:
+        auth_client = idp.create_auth_client()
+        await auth_client.refresh()
+        return await is_token_valid(AccessToken(token, auth_client), strategy)
+
+    return asyncio.run(run())
+
+
+def test_local_strategy_accepts_valid_token_without_introspection(idp, private_key):
+    assert validate(idp, issue_token(private_key), "local")
+    assert "/introspect" not in idp.requests
+
+
+@pytest.mark.parametrize("claims", [
+    {"iss": "http://other-idp"},
+    {"aud": "other-api"},
+    {"exp": int(time.time()) - 60},
+], ids=["issuer", "audience", "expired"])
+def test_local_strategy_rejects_invalid_claims(idp, private_key, claims):
+    assert not validate(idp, issue_token(private_key, **claims), "local")
+    assert "/introspect" not in idp.requests
+
+
+def test_local_strategy_rejects_token_signed_by_unknown_key(idp):
+    other_key, _ = create_signing_key("key-1")
+
+    assert not validate(idp, issue_token(other_key), "local")
+
+
+def test_local_sampled_strategy_introspects_sampled_requests(idp, private_key, monkeypatch):
+    monkeypatch.setattr(config.auth, "introspection_sample_rate", 0.1)
+    idp.active = False
+    token = issue_token(private_key)
+
+    monkeypatch.setattr(api_dependencies.random, "random", lambda: 0.5)
+    assert validate(idp, token, "local_sampled")
+    assert idp.requests.count("/introspect") == 0
+
+    monkeypatch.setattr(api_dependencies.random, "random", lambda: 0.05)
+    assert not validate(idp, token, "local_sampled")
+    assert idp.requests.count("/introspect") == 1
+
+
+def test_run_and_cancel_always_introspect(idp, private_key, monkeypatch):
+    monkeypatch.setattr(config.auth, "validation_strategy", "local")
+    idp.active = False
+    app = FastAPI()
+    app.include_router(api_router)
+    app.state.auth_client = idp.create_auth_client()
+
+    def headers() -> dict:
+        # A new token for every request, the introspection result is cached per token
+        return {"Authorization": f"Bearer {issue_token(private_key)}"}
+
+    with TestClient(app) as client:
+        run = {"workflow_definition_id": str(uuid4()), "input_dir": "in", "output_dir": "out"}
+        assert client.post("/api/run", json=run, headers=headers()).status_code == 401
+        assert client.delete(f"/api/workflow/{uuid4()}", headers=headers()).status_code == 401
+
+    assert idp.requests.count("/introspect") == 2
+
+
+def test_concurrent_misses_fetch_jwks_once(idp):
+    signing_keys = SigningKeyCache(idp.create_http_clients())
+
+    async def run():
+        return await asyncio.gather(*(signing_keys.get(JWKS_URL, "key-1") for _ in range(10)))
+
+    assert {key.key_id for key in asyncio.run(run())} == {"key-1"}
+    assert idp.requests.count("/jwks") == 1
+
+
+def test_refetches_jwks_for_unknown_kid(idp):
+    signing_keys = SigningKeyCache(idp.create_http_clients(), min_refetch_interval=0)
+    _, rotated_jwk = create_signing_key("key-2")
+
+    async def run():
+        await signing_keys.get(JWKS_URL, "key-1")
+        idp.jwks.append(rotated_jwk)
+        return await signing_keys.get(JWKS_URL, "key-2")
+
+    assert asyncio.run(run()).key_id == "key-2"
+    assert idp.requests.count("/jwks") == 2
+
+
+def test_serves_cached_key_while_jwks_refresh_fails():
+    _, jwk = create_signing_key("key-1")
+    idp = MockIdP([jwk])
+    signing_keys = SigningKeyCache(idp.create_http_clients(), ttl=60, min_refetch_interval=10)
+
+    async def run():
+        assert (await signing_keys.get(JWKS_URL, "key-1")).key_id == "key-1"
+
+        # The JWKS expires while the IdP is unreachable
+        idp.jwks_down = True
+        signing_keys._fetched_at -= 120
+        signing_keys._attempted_at -= 120
+
+        assert (await signing_keys.get(JWKS_URL, "key-1")).key_id == "key-1"
+        assert (await signing_keys.get(JWKS_URL, "key-1")).key_id == "key-1"
+        assert idp.requests.count("/jwks") == 2
+
+        with pytest.raises(jwt.PyJWKClientError):
+            await signing_keys.get(JWKS_URL, "key-2")
+        assert idp.requests.count("/jwks") == 2
+
+    asyncio.run(run())
+
+
+def test_raises_jwk_client_error_when_jwks_is_unreachable():
+    idp = MockIdP([])
+    idp.jwks_down = True
+    signing_keys = SigningKeyCache(idp.create_http_clients())
+
+    with pytest.raises(jwt.PyJWKClientError):
+        asyncio.run(signing_keys.get(JWKS_URL, "key-1"))
+
+
+def test_logs_token_cache_hit_ratios(caplog):
+    auth_client = MockIdP([]).create_auth_client()
+    auth_client.introspection_cache.set("token", True)
+    auth_client.introspection_cache.get("token")
+    auth_client.introspection_cache.get("other")
+
+    with caplog.at_level(logging.INFO, logger="app.auth"):
+        auth_client.log_cache_stats()
+
+    assert "Token introspection cache: 1 entries, 1 hits, 1 misses, hit ratio 0.50" in caplog.messages
+    assert "Token claims cache: 0 entries, 0 hits, 0 misses, hit ratio 0.00" in caplog.messages
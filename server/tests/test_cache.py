@@ -0,0 +1,54 @@
+import math
+import time
+
+from app.cache import TTLCache
+
+
+def test_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entry_ttl_is_capped_by_cache_ttl():
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=0.05)
+    cache.set("a", 1, ttl=3600)
+    cache.set("b", 2, ttl=-1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_hit_ratio():
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.hits == 2
+    assert cache.misses == 1
+    assert cache.hit_ratio == 2 / 3
+
+
+def test_evicts_to_stay_within_byte_budget():
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=math.inf, max_bytes=100)
+    cache.set("a", 1, size=40)
+    cache.set("b", 2, size=40)
+    cache.set("c", 3, size=40)
+    cache.set("huge", 4, size=101)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+    assert cache.get("huge") is None
+    assert cache.size == 80
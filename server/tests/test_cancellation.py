@@ -0,0 +1,38 @@
+import os
+
+from app.cancellation import CancellationListener
+from app.config import config
+from app.tasks import start_cancellation_listener
+
+
+def create_listener() -> CancellationListener:
+    # The Redis client only connects once the listener is started
+    return CancellationListener("redis://localhost", "workflow")
+
+
+def test_message_signals_cancellation_once():
+    listener = create_listener()
+
+    listener._on_message({"data": b"cancel"})
+    listener._on_message({"data": b"cancel"})
+
+    assert listener.is_cancelled()
+    assert os.read(listener.fileno(), 16) == b"\0"
+    listener.close()
+
+
+def test_message_after_close_is_ignored():
+    listener = create_listener()
+    listener.close()
+
+    # A late message from a listener thread that outlived the join
+    listener._on_message({"data": b"cancel"})
+    listener.close()
+
+    assert not listener.is_cancelled()
+
+
+def test_falls_back_to_polling_when_listener_cannot_be_created(monkeypatch):
+    monkeypatch.setattr(config.celery, "cancel_redis_url", "not-a-redis-url")
+
+    assert start_cancellation_listener("workflow") is None
@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.http_client import HttpClientPool
+
+
+def create_pool(responses: list, retries: int) -> tuple[HttpClientPool, list]:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return httpx.Response(response)
+
+    pool = HttpClientPool(retries=retries, retry_backoff=0)
+    pool._clients["http://tes"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return pool, requests
+
+
+def test_get_retries_server_and_connection_errors():
+    pool, requests = create_pool([503, httpx.ConnectError("refused"), 200], retries=2)
+
+    response = asyncio.run(pool.get("http://tes/v1/tasks/1"))
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_get_gives_up_after_retries():
+    pool, requests = create_pool([500, 502], retries=1)
+    assert asyncio.run(pool.get("http://tes/v1/tasks/1")).status_code == 502
+
+    pool, requests = create_pool([httpx.ConnectError("refused")], retries=0)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(pool.get("http://tes/v1/tasks/1"))
+
+
+def test_get_does_not_retry_client_errors():
+    pool, requests = create_pool([404], retries=2)
+
+    assert asyncio.run(pool.get("http://tes/v1/tasks/1")).status_code == 404
+    assert len(requests) == 1
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.common.models import JobSummaryModel
+from app.http_client import HttpClientPool
+from app.job_cache import MemoryJobCache, RedisJobCache
+from app.repository import JobRepository
+from app.routes import job_logs
+
+
+class Token:
+    value = "token"
+
+
+def create_task(task_id: str, state: str = "COMPLETE") -> dict:
+    return {
+        "id": task_id, "state": state, "name": task_id, "description": "",
+        "creation_time": "2024-01-01T00:00:00Z", "executors": [], "inputs": [], "logs": [],
+    }
+
+
+class SlowJobRepository(JobRepository):
+    def __init__(self, delays: dict[str, float], **kwargs):
+        super().__init__("http://tes", None, **kwargs)  # type: ignore
+        self.delays = delays
+        self.running = 0
+        self.max_running = 0
+
+    async def _get_model(self, job_id, token, list_view=False, check_cache=True):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays[job_id])
+        finally:
+            self.running -= 1
+
+        if job_id == "failed":
+            raise RuntimeError("TES is down")
+        return JobSummaryModel.model_validate(create_task(job_id))
+
+
+def test_fetches_concurrently_within_bound_and_keeps_order():
+    repository = SlowJobRepository({str(i): 0.01 * (5 - i) for i in range(5)}, max_concurrency=3)
+
+    jobs = asyncio.run(repository.get_list([str(i) for i in range(5)], Token()))  # type: ignore
+
+    assert [job.id for job in jobs] == ["0", "1", "2", "3", "4"]
+    assert repository.max_running == 3
+
+
+def test_returns_partial_results_after_deadline():
+    repository = SlowJobRepository({"fast": 0, "failed": 0, "slow": 10}, deadline=0.1)
+
+    jobs = asyncio.run(repository.get_list(["slow", "failed", "fast"], Token()))  # type: ignore
+
+    assert [job.id for job in jobs] == ["fast"]
+
+
+def create_repository(tasks: dict[str, dict], **kwargs) -> tuple[JobRepository, list]:
+    """Returns a repository reading `tasks` from a mocked TES server."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, text=json.dumps(tasks[request.url.path.split("/")[-1]]))
+
+    http_clients = HttpClientPool()
+    http_clients._clients["http://tes"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JobRepository("http://tes", http_clients, **kwargs), requests
+
+
+def test_caches_terminal_tasks_only():
+    tasks = {"done": create_task("done", "COMPLETE"), "running": create_task("running", "RUNNING")}
+    cache = MemoryJobCache(running_ttl=0, max_size=10, max_bytes=10000)
+    repository, requests = create_repository(tasks, cache=cache)
+
+    for _ in range(3):
+        jobs = asyncio.run(repository.get_list(["done", "running"], Token()))  # type: ignore
+        assert [job.state for job in jobs] == ["COMPLETE", "RUNNING"]
+
+    assert requests.count("/v1/tasks/done") == 1
+    assert requests.count("/v1/tasks/running") == 3
+
+
+class RecordingRedis:
+    """Stands in for the Redis client of RedisJobCache, recording the commands sent."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.expiries: dict[str, int | None] = {}
+        self.commands: list[str] = []
+
+    async def mget(self, keys):
+        self.commands.append("MGET")
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, px=None):
+        self.commands.append("SET")
+        self.values[key] = value
+        self.expiries[key] = px
+
+    async def delete(self, *keys):
+        self.commands.append("DEL")
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_reads_cached_tasks_with_a_single_redis_round_trip():
+    tasks = {task_id: create_task(task_id) for task_id in ["a", "b", "c"]}
+    cache = RedisJobCache(running_ttl=5, redis_url="redis://localhost")
+    cache.redis = RecordingRedis()  # type: ignore
+    repository, requests = create_repository(tasks, cache=cache)
+
+    asyncio.run(repository.get_list(["a", "b"], Token()))  # type: ignore
+    cache.redis.commands.clear()
+    jobs = asyncio.run(repository.get_list(["a", "b", "c"], Token()))  # type: ignore
+
+    assert [job.id for job in jobs] == ["a", "b", "c"]
+    assert requests == ["/v1/tasks/a", "/v1/tasks/b", "/v1/tasks/c"]
+    assert cache.redis.commands == ["MGET", "SET"]
+
+
+def test_refetches_tasks_whose_cache_entry_no_longer_parses():
+    tasks = {"a": create_task("a"), "b": create_task("b", "RUNNING")}
+    cache = RedisJobCache(running_ttl=5, redis_url="redis://localhost", terminal_ttl=3600)
+    cache.redis = RecordingRedis()  # type: ignore
+    cache.redis.values["tes-task:http://tes/v1/tasks/a?view=BASIC"] = '{"id": "a", "status": "renamed"}'
+    repository, requests = create_repository(tasks, cache=cache)
+
+    jobs = asyncio.run(repository.get_list(["a", "b"], Token()))  # type: ignore
+
+    assert [job.state for job in jobs] == ["COMPLETE", "RUNNING"]
+    assert requests == ["/v1/tasks/a", "/v1/tasks/b"]
+    assert cache.redis.commands == ["MGET", "DEL", "SET", "SET"]
+    # Terminal tasks expire too, after the long terminal TTL
+    assert cache.redis.expiries == {
+        "tes-task:http://tes/v1/tasks/a?view=BASIC": 3600 * 1000,
+        "tes-task:http://tes/v1/tasks/b?view=BASIC": 5 * 1000,
+    }
+
+
+def test_get_logs_returns_tail_or_byte_range():
+    task = create_task("a")
+    task["logs"] = [{
+        "end_time": "", "start_time": "2024-01-01T00:00:00Z", "metadata": {}, "outputs": [],
+        "logs": [{"end_time": "", "exit_code": 0, "stdout": "one\ntwo\nthree\n", "stderr": "oops"}],
+    }]
+    repository, _ = create_repository({"a": task})
+
+    tail = asyncio.run(repository.get_logs("a", Token(), tail=2))  # type: ignore
+    assert (tail.content, tail.offset, tail.size) == ("two\nthree\n", 4, 14)
+
+    byte_range = asyncio.run(repository.get_logs("a", Token(), offset=4, length=3))  # type: ignore
+    assert byte_range.content == "two"
+
+    stderr = asyncio.run(repository.get_logs("a", Token(), stream="stderr"))  # type: ignore
+    assert stderr.content == "oops"
+
+
+def test_for_endpoint_reads_from_other_tes_server():
+    tasks = {"a": create_task("a")}
+    repository, requests = create_repository(tasks)
+    other_repository, other_requests = create_repository(tasks)
+    repository.http_clients._clients["http://other-tes"] = other_repository.http_clients.get_client("http://tes")
+
+    jobs = asyncio.run(repository.for_endpoint("http://other-tes").get_list(["a"], Token()))  # type: ignore
+
+    assert [job.id for job in jobs] == ["a"]
+    assert requests == []
+    assert other_requests == ["/v1/tasks/a"]
+    assert repository.for_endpoint(None) is repository
+
+
+@pytest.mark.parametrize("query", [{"offset": 4}, {"length": 3}], ids=["offset", "length"])
+def test_logs_endpoint_rejects_tail_with_byte_range(query):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(job_logs(uuid4(), "a", tail=2, **{"offset": None, "length": None, **query}))  # type: ignore
+
+    assert error.value.status_code == 422
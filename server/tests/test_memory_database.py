@@ -0,0 +1,102 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from app.common import WorkflowState
+from app.db import AsyncMemoryDatabase, MemoryDatabase
+from app.db.models import WorkflowModel
+from app.http_client import HttpClientPool
+from app.repository import AsyncWorkflowRepository, JobRepository, WorkflowRepository
+
+
+def create_repository() -> AsyncWorkflowRepository:
+    return AsyncWorkflowRepository(AsyncMemoryDatabase(), None)  # type: ignore
+
+
+def test_list_by_user_paginates_without_duplicates():
+    repository = create_repository()
+
+    async def run() -> list:
+        created_at = datetime(2024, 1, 1, tzinfo=UTC)
+        for i in range(5):
+            # Two workflows share every timestamp, so the ID breaks the tie
+            await repository.save(WorkflowModel(
+                id=uuid4(), task_id=str(i), created_by="alice", created_at=created_at + timedelta(minutes=i // 2)
+            ))
+        await repository.save(WorkflowModel(id=uuid4(), task_id="other", created_by="bob"))
+
+        ids = []
+        cursor = None
+        while True:
+            page = await repository.get_list_by_user("alice", 2, cursor)
+            ids.extend(item.id for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        return [(workflow_id, (await repository.get(workflow_id)).created_at) for workflow_id in ids]
+
+    workflows = asyncio.run(run())
+
+    ids = [workflow_id for workflow_id, _ in workflows]
+    assert len(ids) == len(set(ids)) == 5
+
+    created = [created_at for _, created_at in workflows]
+    assert created == sorted(created, reverse=True)
+
+
+def test_list_by_user_filters_by_state():
+    repository = create_repository()
+    running = WorkflowModel(id=uuid4(), task_id="1", created_by="alice", state=WorkflowState.RUNNING)
+
+    async def run():
+        await repository.save(running)
+        await repository.save(WorkflowModel(id=uuid4(), task_id="2", created_by="alice", state=WorkflowState.FAILED))
+        return await repository.get_list_by_user("alice", 10, states=[WorkflowState.RUNNING])
+
+    page = asyncio.run(run())
+
+    assert [item.id for item in page.items] == [running.id]
+
+
+class CountingAsyncMemoryDatabase(AsyncMemoryDatabase):
+    def __init__(self):
+        super().__init__()
+        self.get_one_calls = 0
+
+    async def get_one(self, model, filter):
+        self.get_one_calls += 1
+        return await super().get_one(model, filter)
+
+
+def test_request_reads_workflow_from_database_once():
+    db = CountingAsyncMemoryDatabase()
+    repository = AsyncWorkflowRepository(db, JobRepository("http://tes", HttpClientPool()))
+    workflow = WorkflowModel(id=uuid4(), task_id="1", created_by="alice")
+
+    async def run():
+        await db.insert_one(WorkflowModel, workflow)
+        # An ownership check followed by the detail, as in the workflow detail route
+        owner = await repository.get_owner(workflow.id)
+        detail = await repository.get_detail(workflow.id, None)  # type: ignore
+        return owner, detail
+
+    owner, detail = asyncio.run(run())
+
+    assert owner == "alice"
+    assert detail.id == workflow.id
+    assert db.get_one_calls == 1
+
+
+def test_update_progress_keeps_canceled_state():
+    db = MemoryDatabase()
+    repository = WorkflowRepository(db)
+    workflow = WorkflowModel(id=uuid4(), task_id="1", created_by="alice", job_ids=["a"], state=WorkflowState.CANCELED)
+    db.insert_one(WorkflowModel, workflow)
+
+    repository.update_progress(workflow.id, state=WorkflowState.RUNNING, finished_jobs=1, job_ids=["b"])
+
+    stored = db.get_one(WorkflowModel, {"id": workflow.id})
+    assert stored.state == WorkflowState.CANCELED
+    assert stored.finished_jobs == 1
+    assert stored.job_ids == ["a", "b"]
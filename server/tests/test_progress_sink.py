@@ -0,0 +1,75 @@
+import time
+from uuid import uuid4
+
+from app.common import WorkflowState
+from app.sinks import ProgressSink, RunLogSink
+from app.tasks import log_handler
+
+
+class RecordingWorkflowRepository:
+    def __init__(self):
+        self.updates = []
+
+    def update_progress(self, workflow_id, **kwargs):
+        self.updates.append(kwargs)
+        return True
+
+
+def test_coalesces_updates_until_flush():
+    repository = RecordingWorkflowRepository()
+    sink = ProgressSink(repository, uuid4(), flush_interval=3600)  # type: ignore
+
+    sink.update(total_jobs=3)
+    sink.update(finished_jobs=1)
+    sink.update(finished_jobs=2)
+    assert repository.updates == []
+
+    sink.flush()
+    assert repository.updates == [
+        {"state": None, "finished_jobs": 2, "total_jobs": 3, "job_ids": []}
+    ]
+
+
+def test_state_change_is_written_immediately():
+    repository = RecordingWorkflowRepository()
+    sink = ProgressSink(repository, uuid4(), flush_interval=3600)  # type: ignore
+
+    sink.update(state=WorkflowState.RUNNING, job_id="a")
+    sink.update(state=WorkflowState.RUNNING, job_id="b")
+    sink.update(state=WorkflowState.RUNNING, job_id="c")
+    sink.update(state=WorkflowState.FINISHED, finished_jobs=3)
+
+    assert repository.updates == [
+        {"state": WorkflowState.RUNNING, "finished_jobs": None, "total_jobs": None, "job_ids": ["a"]},
+        {"state": WorkflowState.FINISHED, "finished_jobs": 3, "total_jobs": None, "job_ids": ["b", "c"]},
+    ]
+
+
+def test_flush_without_pending_updates_does_not_write():
+    repository = RecordingWorkflowRepository()
+    sink = ProgressSink(repository, uuid4(), flush_interval=0)  # type: ignore
+
+    sink.flush()
+    sink.flush_if_due()
+
+    assert repository.updates == []
+
+
+def test_flushes_pending_updates_during_output_without_progress(tmp_path):
+    repository = RecordingWorkflowRepository()
+    sink = ProgressSink(repository, uuid4(), flush_interval=0.05)  # type: ignore
+
+    with RunLogSink(str(tmp_path / "run.log"), flush_interval=3600) as run_log_sink:
+        log_handler(sink, run_log_sink, "[TES] Task submitted: a")
+        log_handler(sink, run_log_sink, "[TES] Task submitted: b")
+        assert len(repository.updates) == 1
+
+        for _ in range(5):
+            time.sleep(0.02)
+            log_handler(sink, run_log_sink, "rule align: input: sample.fastq")
+
+        assert repository.updates[-1]["job_ids"] == ["b"]
+        log_handler(sink, run_log_sink, "1 of 2 steps (50%) done")
+
+    sink.flush()
+    assert [update["job_ids"] for update in repository.updates] == [["a"], ["b"], []]
@@ -0,0 +1,30 @@
+import pytest
+
+from app.sinks import RunLogSink
+
+
+def test_buffers_lines_until_buffer_is_full(tmp_path):
+    log_file_path = tmp_path / "run.log"
+
+    with RunLogSink(str(log_file_path), flush_interval=3600, buffer_size=10) as sink:
+        sink.write("first")
+        assert log_file_path.read_text() == ""
+
+        sink.write("second")
+        assert log_file_path.read_text() == "first\nsecond\n"
+
+        sink.write("third")
+
+    assert log_file_path.read_text() == "first\nsecond\nthird\n"
+
+
+def test_writes_buffer_on_error(tmp_path):
+    log_file_path = tmp_path / "run.log"
+    log_file_path.write_text("previous run\n")
+
+    with pytest.raises(RuntimeError):
+        with RunLogSink(str(log_file_path), flush_interval=3600) as sink:
+            sink.write("line")
+            raise RuntimeError
+
+    assert log_file_path.read_text() == "previous run\nline\n"
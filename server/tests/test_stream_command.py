@@ -0,0 +1,89 @@
+import os
+import signal
+import sys
+import threading
+import time
+
+from app.tasks import stream_command
+
+
+def test_streams_lines_across_chunks():
+    lines = []
+    script = (
+        "import sys\n"
+        "sys.stdout.write('a' * 100000 + '\\n')\n"
+        "sys.stdout.write('multi\\nline\\nburst\\n')\n"
+        "sys.stdout.write('\\u017elu\\u0165ou\\u010dk\\u00fd k\\u016f\\u0148\\n')\n"
+        "sys.stdout.write('no newline at end')\n"
+    )
+
+    result = stream_command([sys.executable, "-c", script], stdout_handler=lines.append)
+
+    assert result.returncode == 0
+    assert lines == ["a" * 100000, "multi", "line", "burst", "žluťoučký kůň", "no newline at end"]
+
+
+def test_translates_universal_newlines():
+    lines = []
+    script = (
+        "import sys, time\n"
+        "sys.stdout.write('1 of 2 steps (50%) done\\r\\n')\n"
+        "sys.stdout.write('progress 1\\rprogress 2\\r')\n"
+        "sys.stdout.flush()\n"
+        "time.sleep(0.1)\n"
+        "sys.stdout.write('\\nlast\\r')\n"
+    )
+
+    result = stream_command([sys.executable, "-c", script], stdout_handler=lines.append)
+
+    assert result.returncode == 0
+    # The "\r\n" split across two reads still ends a single line
+    assert lines == ["1 of 2 steps (50%) done", "progress 1", "progress 2", "last"]
+
+
+def test_aborts_on_schedule():
+    checks = []
+
+    def abort_condition():
+        checks.append(time.monotonic())
+        return len(checks) == 3
+
+    started_at = time.monotonic()
+    result = stream_command(
+        [sys.executable, "-c", "import time\nwhile True: time.sleep(1)"],
+        abort_condition=abort_condition,
+        abort_signal=signal.SIGTERM,
+        abort_check_interval=0.05,
+    )
+
+    assert result.returncode == -signal.SIGTERM
+    assert len(checks) == 3
+    assert time.monotonic() - started_at < 1
+
+
+class PipeNotifier:
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+
+    def fileno(self):
+        return self.read_fd
+
+    def notify(self):
+        os.write(self.write_fd, b"\0")
+
+
+def test_aborts_when_notified():
+    notifier = PipeNotifier()
+    threading.Timer(0.1, notifier.notify).start()
+
+    started_at = time.monotonic()
+    result = stream_command(
+        [sys.executable, "-c", "import time\nwhile True: time.sleep(1)"],
+        abort_condition=lambda: False,
+        abort_signal=signal.SIGTERM,
+        abort_notifier=notifier,
+        abort_check_interval=3600,
+    )
+
+    assert result.returncode == -signal.SIGTERM
+    assert time.monotonic() - started_at < 1
@@ -3,6 +3,7 @@ from uuid import uuid4
 
 from app import create_app
 from app.workflow_definition import Entitlement, WorkflowDefinitionMetadata
+from app.workflow_definition.manager import WorkflowDefinitionCatalog
 
 
 @pytest.fixture
@@ -44,3 +45,39 @@ def test_get_allowed_entitlement_patterns(app, workflow_definition, entitlements
     ]
 
     assert workflow_definition.allowed_entitlement_patterns == expected
+
+
+def test_is_entitlement_satisfied(app, workflow_definition):
+    assert workflow_definition.is_entitlement_satisfied(
+        ["urn:other", "urn:geant:lifescience-ri.eu:group:students:member"]
+    )
+    assert workflow_definition.is_entitlement_satisfied(
+        ["urn:swamid:se:members:organization:EGI:#swamid.se"]
+    )
+    assert not workflow_definition.is_entitlement_satisfied(
+        ["urn:geant:example.org:group:students:member"]
+    )
+    assert not workflow_definition.is_entitlement_satisfied([])
+
+
+def test_is_entitlement_satisfied_without_allowed_entitlements(app):
+    workflow_definition = WorkflowDefinitionMetadata(dir="dir", id=uuid4(), name="name")
+
+    assert not workflow_definition.is_entitlement_satisfied(["urn:anything"])
+
+
+def test_catalog_get_authorized_ids(app, workflow_definition):
+    restricted = WorkflowDefinitionMetadata(
+        dir="dir",
+        id=uuid4(),
+        name="restricted",
+        allowed_entitlements=[{"prefix": "urn:", "values": ["admins"], "suffix": ""}],
+    )
+    catalog = WorkflowDefinitionCatalog("revision", [workflow_definition, restricted])
+
+    entitlements = ["urn:geant:lifescience-ri.eu:group:entitled:member"]
+    assert catalog.get_authorized_ids(entitlements) == {workflow_definition.id}
+    assert catalog.get_authorized_ids(entitlements + ["urn:admins"]) == {
+        workflow_definition.id,
+        restricted.id,
+    }
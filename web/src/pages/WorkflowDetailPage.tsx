@@ -11,6 +11,8 @@ import {
   TableContainer,
   TableHead,
   TableRow,
+  ToggleButton,
+  ToggleButtonGroup,
   Tooltip,
 } from '@mui/material';
 import Paper from '@mui/material/Paper';
@@ -36,9 +38,20 @@ interface JobInfo {
   id: string;
   created_at: string;
   state: string;
-  logs: string;
 }
 
+type LogStream = 'stdout' | 'stderr';
+
+interface JobLogs {
+  id: string;
+  stream: LogStream;
+  content: string;
+  offset: number;
+  size: number;
+}
+
+const LOG_TAIL_LINES = 1000;
+
 type WorkflowState = 'UNKNOWN' | 'RUNNING' | 'FINISHED' | 'FAILED' | 'CANCELED';
 
 interface WorfklowDetail {
@@ -128,7 +141,9 @@ const WorkflowDetailPage = () => {
               </TableHead>
               <TableBody>
                 {workflowDetail?.jobs.map((job) => {
-                  return <Row key={job.id} job={job} />;
+                  return (
+                    <Row key={job.id} workflowId={workflowId!} job={job} />
+                  );
                 })}
               </TableBody>
             </Table>
@@ -143,9 +158,29 @@ const WorkflowDetailPage = () => {
   );
 };
 
-function Row(props: { job: JobInfo }) {
-  const { job } = props;
+function Row(props: { workflowId: string; job: JobInfo }) {
+  const { workflowId, job } = props;
   const [open, setOpen] = useState(false);
+  const [stream, setStream] = useState<LogStream>('stdout');
+  const [logs, setLogs] = useState<JobLogs>();
+
+  // Logs are only loaded for expanded jobs, and reloaded on every expand
+  useEffect(() => {
+    if (!open) {
+      return;
+    }
+
+    api
+      .get<JobLogs>(`/workflow/${workflowId}/job/${job.id}/logs`, {
+        params: { stream, tail: LOG_TAIL_LINES },
+      })
+      .then((res) => {
+        setLogs(res.data);
+      })
+      .catch(() => {
+        console.error('Failed to get job logs');
+      });
+  }, [open, stream, workflowId, job.id]);
 
   return (
     <>
@@ -173,8 +208,24 @@ function Row(props: { job: JobInfo }) {
           colSpan={6}>
           <Collapse in={open} timeout='auto'>
             <div className='max-h-96 overflow-y-scroll px-2 container'>
+              <ToggleButtonGroup
+                value={stream}
+                exclusive
+                size='small'
+                className='bg-white mt-2'
+                onChange={(_, value: LogStream | null) =>
+                  value && setStream(value)
+                }>
+                <ToggleButton value='stdout'>stdout</ToggleButton>
+                <ToggleButton value='stderr'>stderr</ToggleButton>
+              </ToggleButtonGroup>
               <Box sx={{ margin: 1 }} className='text-white'>
-                {job.logs.split(/\r\n|\n|\r/).map((i, key) => (
+                {logs && logs.offset > 0 && (
+                  <pre className='text-gray-400'>
+                    Showing the last {LOG_TAIL_LINES} lines of the log
+                  </pre>
+                )}
+                {(logs?.content ?? '').split(/\r\n|\n|\r/).map((i, key) => (
                   <pre key={key} className='whitespace-pre-line'>
                     {i.replaceAll(/\p{C}/gu, '')}
                   </pre>
@@ -1,7 +1,8 @@
 import api from '../utils/api';
-import { useEffect, useState } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import Header from '../components/Header';
 import {
+  Button,
   Paper,
   Table,
   TableBody,
@@ -28,6 +29,11 @@ interface WorkflowResponseProps {
   finished_jobs: number;
 }
 
+interface WorkflowListPageResponse {
+  items: WorkflowResponseProps[];
+  next_cursor: string | null;
+}
+
 interface WorkflowProps {
   id: string;
   state: string;
@@ -40,23 +46,29 @@ const WorkflowsPage = () => {
   const navigate = useNavigate();
 
   const [workflows, setWorkflows] = useState<WorkflowProps[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  useEffect(() => {
-    (async () => {
-      const res = await api.get<WorkflowResponseProps[]>('/workflow');
-      if (res.status !== 200) {
-        console.error('Failed to get workflows');
-        return;
-      }
+  const getWorkflows = useCallback(async (cursor: string | null) => {
+    const res = await api.get<WorkflowListPageResponse>('/workflow', {
+      params: cursor ? { cursor } : {},
+    });
+    if (res.status !== 200) {
+      console.error('Failed to get workflows');
+      return;
+    }
 
-      const data = res.data.map((prev) => ({
-        ...prev,
-        created_at: new Date(prev.created_at),
-      }));
-      setWorkflows(data);
-    })();
+    const data = res.data.items.map((prev) => ({
+      ...prev,
+      created_at: new Date(prev.created_at),
+    }));
+    setWorkflows((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.data.next_cursor);
   }, []);
 
+  useEffect(() => {
+    getWorkflows(null);
+  }, [getWorkflows]);
+
   return (
     <>
       <Header />
@@ -104,6 +116,13 @@ const WorkflowsPage = () => {
                   ))}
               </TableBody>
             </Table>
+            {nextCursor && (
+              <div className='text-center my-2'>
+                <Button onClick={() => getWorkflows(nextCursor)}>
+                  Load more
+                </Button>
+              </div>
+            )}
           </TableContainer>
         ) : (
           <div className='text-center text-3xl mt-10 text-black'>